@@ -1,6 +1,8 @@
 """Pattern-based analyzer helpers."""
 
+from bisect import bisect_right
 from dataclasses import dataclass, field
+from itertools import accumulate
 import re
 from typing import Any, Iterable, Optional
 
@@ -25,12 +27,16 @@ class PatternRule:
     normalized_sink: Optional[str] = None
 
 
-def _line_for_offset(content: str, offset: int) -> int:
-    return content.count("\n", 0, offset) + 1
+def _line_starts(content: str) -> list[int]:
+    """Offsets at which each line of content starts."""
+    return list(accumulate((len(line) + 1 for line in content.split("\n")), initial=0))[:-1]
 
 
-def _snippet_for_match(content: str, start_line: int, end_line: int, max_lines: int = 6) -> str:
-    lines = content.splitlines()
+def _line_for_offset(line_starts: list[int], offset: int) -> int:
+    return bisect_right(line_starts, offset)
+
+
+def _snippet_for_match(lines: list[str], start_line: int, end_line: int, max_lines: int = 6) -> str:
     start_idx = max(0, start_line - 1)
     end_idx = min(len(lines), end_line)
     snippet_lines = lines[start_idx:end_idx]
@@ -45,11 +51,17 @@ def match_patterns(
     rules: Iterable[PatternRule],
 ) -> list[FindingMatch]:
     matches: list[FindingMatch] = []
+    # Built on the first match and shared by every rule for this file
+    line_starts: Optional[list[int]] = None
+    lines: list[str] = []
     for rule in rules:
         for match in re.finditer(rule.pattern, content, rule.flags):
-            start_line = _line_for_offset(content, match.start())
-            end_line = _line_for_offset(content, match.end())
-            snippet = _snippet_for_match(content, start_line, end_line)
+            if line_starts is None:
+                line_starts = _line_starts(content)
+                lines = content.splitlines()
+            start_line = _line_for_offset(line_starts, match.start())
+            end_line = _line_for_offset(line_starts, match.end())
+            snippet = _snippet_for_match(lines, start_line, end_line)
             matches.append(
                 FindingMatch(
                     rule_id=rule.rule_id,
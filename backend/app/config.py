@@ -48,6 +48,13 @@ class Settings(BaseSettings):
     gemini_model: str = "gemini-2.0-flash"
     gemini_embedding_model: str = "text-embedding-004"
 
+    # Parser: directory for the persistent AST cache (empty disables it)
+    ast_cache_dir: str = ""
+
+    # Q&A: reuse a stored answer when a new question embeds close enough to it
+    qa_answer_cache_enabled: bool = False
+    qa_answer_cache_threshold: float = 0.92
+
     # Celery
     celery_broker_url: str = "redis://localhost:6379/1"
     celery_result_backend: str = "redis://localhost:6379/2"
@@ -1,6 +1,7 @@
 """Database configuration and session management."""
 
-from typing import AsyncGenerator
+import json
+from typing import Any, AsyncGenerator
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -10,12 +11,34 @@ from app.config import get_settings
 
 settings = get_settings()
 
+# JSON/JSONB columns are encoded and decoded with orjson when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_serializer(value: Any) -> str:
+    """Serialize a JSON column value, falling back to json for types orjson rejects."""
+    try:
+        return orjson.dumps(
+            value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    except TypeError:
+        return json.dumps(value)
+
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     pool_size=settings.database_pool_size,
     pool_pre_ping=True,
     echo=settings.app_debug,
+    **(
+        {"json_serializer": _json_serializer, "json_deserializer": orjson.loads}
+        if orjson
+        else {}
+    ),
 )
 
 # Session factory
@@ -3,8 +3,8 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -28,6 +28,12 @@ class Answer(Base):
     # Question
     question: Mapped[str] = mapped_column(Text, nullable=False)
 
+    # Answer cache: answers are reused only for the same indexed commit, by
+    # normalized question hash or by question embedding similarity
+    commit_sha: Mapped[str | None] = mapped_column(String(40))
+    question_hash: Mapped[str | None] = mapped_column(String(64))
+    question_embedding: Mapped[list[float] | None] = mapped_column(ARRAY(Float))
+
     # Structured answer
     answer_text: Mapped[str | None] = mapped_column(Text)
     answer_sections: Mapped[list | None] = mapped_column(JSONB)  # [{text, source_ids}]
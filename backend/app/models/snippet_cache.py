@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime, timedelta
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -47,12 +47,16 @@ class SnippetCache(Base):
     expires_at: Mapped[datetime] = mapped_column(DateTime, default=default_expiry)
 
     __table_args__ = (
-        UniqueConstraint(
+        # One unique index both enforces one row per location and covers the
+        # citation lookup, so cache hits are served index-only
+        Index(
+            "uq_snippet_cache_location",
             "repo_id",
             "commit_sha",
             "file_path",
             "start_line",
             "end_line",
-            name="uq_snippet_cache_location",
+            unique=True,
+            postgresql_include=["content", "expires_at"],
         ),
     )
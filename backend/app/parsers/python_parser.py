@@ -14,7 +14,7 @@ from typing import Optional
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class Symbol:
     """A code symbol (function, class, method, etc.)."""
 
@@ -39,7 +39,7 @@ class Symbol:
                 self.qualified_name = self.name
 
 
-@dataclass
+@dataclass(slots=True)
 class Import:
     """An import statement."""
 
@@ -51,7 +51,7 @@ class Import:
     imported_names: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionCall:
     """A function/method call."""
     file_path: str
@@ -0,0 +1,270 @@
+"""Persistent parse-result cache for skipping unchanged files between parses."""
+
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class ContentHashBloomFilter:
+    """Bloom filter over SHA-256 digests of previously parsed file contents.
+
+    A miss means the content has definitely never been parsed, so the
+    persistent cache lookup can be skipped. Digests are already uniformly
+    distributed, so the bit positions are taken straight from consecutive
+    21-bit chunks of the first 8 digest bytes instead of rehashing.
+    """
+
+    NUM_BITS = 1 << 21  # 256 KB on disk
+    NUM_HASHES = 3
+    _BIT_MASK = NUM_BITS - 1
+
+    def __init__(self, data: bytes | None = None):
+        self._bits = bytearray(data) if data else bytearray(self.NUM_BITS // 8)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ContentHashBloomFilter":
+        """Load a filter from disk, starting empty if missing or incompatible."""
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            return cls()
+        if len(data) != cls.NUM_BITS // 8:
+            logger.warning(f"Ignoring bloom filter with unexpected size: {path}")
+            return cls()
+        return cls(data)
+
+    def save(self, path: str | Path, merge: bool = True) -> None:
+        """Atomically write the filter to disk, by default merged with what is there.
+
+        Other processes may have saved their own digests since this filter was
+        loaded; OR-ing in the on-disk bits keeps them. merge=False replaces the
+        file, for a filter rebuilt from the cache's live entries. Each writer
+        uses its own temporary file, and a failed save is logged rather than
+        raised since the filter only gates cache lookups.
+        """
+        path = Path(path)
+        tmp_path = None
+        try:
+            bits = self._bits
+            if merge:
+                on_disk = ContentHashBloomFilter.load(path)._bits
+                merged = int.from_bytes(bits, "little") | int.from_bytes(on_disk, "little")
+                bits[:] = merged.to_bytes(len(bits), "little")
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                f.write(bits)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save bloom filter to {path}: {e}")
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _positions(self, digest: bytes) -> tuple[int, ...]:
+        value = int.from_bytes(digest[:8], "big")
+        return tuple((value >> (21 * i)) & self._BIT_MASK for i in range(self.NUM_HASHES))
+
+    def add(self, digest: bytes) -> None:
+        """Record a content digest."""
+        bits = self._bits
+        for pos in self._positions(digest):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+
+class AstCache:
+    """Persistent parse-result cache keyed by (file path, SHA-256 of content).
+
+    Parse results only depend on the path (which fixes the language) and the
+    content, so one cache can be shared by every clone of every repository.
+    Lookups are gated by a ContentHashBloomFilter: content that has never
+    been parsed skips the SQLite round-trip. Merges only ever add bits, so
+    close() starts a new filter generation from the entries left after
+    pruning; MAX_ENTRIES keeps its false-positive rate around 1-2%.
+    """
+
+    # Bump when Symbol/Import/FunctionCall or extraction output changes
+    SCHEMA_VERSION = 2
+    DB_FILENAME = "ast-cache.db"
+    BLOOM_FILENAME = "ast-cache.bloom"
+
+    # How long a writer waits for another process's write lock
+    BUSY_TIMEOUT_SECONDS = 5.0
+
+    # Commit after this many puts so the write lock is never held for long
+    COMMIT_BATCH_SIZE = 200
+
+    # Pruned on close: entries unused for this long, then the least recently
+    # used beyond MAX_ENTRIES. The cache is shared by every repository, and
+    # each edit to a file adds a new (path, hash) row.
+    MAX_AGE_SECONDS = 30 * 24 * 3600
+    MAX_ENTRIES = 200_000
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.cache_dir / self.DB_FILENAME, timeout=self.BUSY_TIMEOUT_SECONDS
+        )
+        # WAL lets readers in other processes proceed while one of them writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._init_schema()
+        self._uncommitted = 0
+        # Cache hits whose last_used is refreshed on the next flush
+        self._used: list[tuple[str, bytes]] = []
+        self.bloom = ContentHashBloomFilter.load(self.cache_dir / self.BLOOM_FILENAME)
+
+    @classmethod
+    def open(cls, cache_dir: str | None) -> "AstCache | None":
+        """Open the cache in cache_dir, or return None when caching is disabled."""
+        if not cache_dir:
+            return None
+        try:
+            return cls(cache_dir)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"AST cache unavailable at {cache_dir}: {e}")
+            return None
+
+    def _init_schema(self) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS ast")
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ast ("
+            "path TEXT NOT NULL, hash BLOB NOT NULL, "
+            "symbols BLOB NOT NULL, imports BLOB NOT NULL, calls BLOB NOT NULL, "
+            "last_used INTEGER NOT NULL, "
+            "PRIMARY KEY (path, hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ast_last_used ON ast (last_used)")
+        self._conn.commit()
+
+    def get(self, path: str, digest: bytes) -> tuple[list, list, list] | None:
+        """Return cached (symbols, imports, calls) for this path and content digest.
+
+        Any cache error (a locked or corrupt database, an unreadable pickle)
+        is treated as a miss so the caller parses the file normally.
+        """
+        if digest not in self.bloom:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT symbols, imports, calls FROM ast WHERE path = ? AND hash = ?",
+                (path, digest),
+            ).fetchone()
+            if row is None:
+                return None
+            result = pickle.loads(row[0]), pickle.loads(row[1]), pickle.loads(row[2])
+        except Exception as e:
+            logger.warning(f"AST cache read failed for {path}: {e}")
+            return None
+        self._used.append((path, digest))
+        return result
+
+    def put(self, path: str, digest: bytes, symbols: list, imports: list, calls: list) -> None:
+        """Store a parse result, committing every COMMIT_BATCH_SIZE entries.
+
+        Failures are logged and dropped; the cache is only an optimization.
+        """
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ast (path, hash, symbols, imports, calls, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    digest,
+                    pickle.dumps(symbols, pickle.HIGHEST_PROTOCOL),
+                    pickle.dumps(imports, pickle.HIGHEST_PROTOCOL),
+                    pickle.dumps(calls, pickle.HIGHEST_PROTOCOL),
+                    int(time.time()),
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"AST cache write failed for {path}: {e}")
+            return
+        self.bloom.add(digest)
+        self._uncommitted += 1
+        if self._uncommitted >= self.COMMIT_BATCH_SIZE:
+            self.commit()
+
+    def commit(self) -> None:
+        """Commit pending entries, releasing the database write lock."""
+        try:
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"AST cache commit failed: {e}")
+            self._conn.rollback()
+        self._uncommitted = 0
+
+    def flush(self) -> None:
+        """Commit pending entries and hit times, and persist the bloom filter."""
+        self._record_hits()
+        self.commit()
+        self.bloom.save(self.cache_dir / self.BLOOM_FILENAME)
+
+    def _record_hits(self) -> None:
+        if self._used:
+            try:
+                self._conn.executemany(
+                    "UPDATE ast SET last_used = ? WHERE path = ? AND hash = ?",
+                    [(int(time.time()), path, digest) for path, digest in self._used],
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"AST cache hit times not recorded: {e}")
+            self._used = []
+
+    def prune(self) -> int:
+        """Delete stale and least recently used entries; return how many went."""
+        try:
+            deleted = self._conn.execute(
+                "DELETE FROM ast WHERE last_used < ?",
+                (int(time.time()) - self.MAX_AGE_SECONDS,),
+            ).rowcount
+            deleted += self._conn.execute(
+                "DELETE FROM ast WHERE rowid IN ("
+                "SELECT rowid FROM ast ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.MAX_ENTRIES,),
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"AST cache prune failed: {e}")
+            self._conn.rollback()
+            return 0
+        self.commit()
+        return deleted
+
+    def _rebuild_bloom(self) -> None:
+        """Replace the bloom filter with one holding only the live entries."""
+        bloom = ContentHashBloomFilter()
+        try:
+            for (digest,) in self._conn.execute("SELECT hash FROM ast"):
+                bloom.add(digest)
+        except sqlite3.Error as e:
+            logger.warning(f"AST cache bloom rebuild failed: {e}")
+            self.bloom.save(self.cache_dir / self.BLOOM_FILENAME)
+            return
+        self.bloom = bloom
+        bloom.save(self.cache_dir / self.BLOOM_FILENAME, merge=False)
+
+    def close(self) -> None:
+        """Commit, prune, start a new bloom generation and close the database."""
+        try:
+            self._record_hits()
+            self.commit()
+            self.prune()
+            self._rebuild_bloom()
+        finally:
+            self._conn.close()
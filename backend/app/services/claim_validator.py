@@ -7,10 +7,36 @@ ensuring all claims are backed by hard evidence.
 import logging
 import re
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from typing import NamedTuple, Optional
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class _SourceForms(NamedTuple):
+    """Normalized views of one source used for quote matching."""
+
+    normalized: str  # whitespace runs collapsed
+    lowered: str
+    stripped_lines: str  # non-blank lines, stripped, newline-joined
+    normalized_lines: str
+
+
+@lru_cache(maxsize=64)
+def _source_forms(source_content: str) -> _SourceForms:
+    """Build a source's normalized views once for all the quotes citing it."""
+    stripped_lines = "\n".join(
+        line.strip() for line in source_content.split("\n") if line.strip()
+    )
+    return _SourceForms(
+        normalized=_WHITESPACE_RE.sub(" ", source_content.strip()),
+        lowered=source_content.lower(),
+        stripped_lines=stripped_lines,
+        normalized_lines=_WHITESPACE_RE.sub(" ", stripped_lines),
+    )
+
 
 @dataclass
 class Claim:
@@ -153,7 +179,8 @@ class ClaimValidator:
     def verify_quote_in_source(self, quote_text: str, source_content: str) -> bool:
         """Verify that a quote exists in source content.
         
-        Simplified method for direct quote verification.
+        Simplified method for direct quote verification. The source's
+        normalized forms are built once and reused across its quotes.
         
         Args:
             quote_text: The quoted text to verify
@@ -166,40 +193,34 @@ class ClaimValidator:
             return False
 
         quoted_span = quote_text.strip()
-        code_snippet = source_content
-
-        # Normalize whitespace for comparison
-        normalized_quote = re.sub(r"\s+", " ", quoted_span.strip())
-        normalized_code = re.sub(r"\s+", " ", code_snippet.strip())
 
         # Try exact match first (case-sensitive)
-        if quoted_span in code_snippet:
+        if quoted_span in source_content:
             return True
 
+        forms = _source_forms(source_content)
+
         # Try normalized match
-        if normalized_quote in normalized_code:
+        if _WHITESPACE_RE.sub(" ", quoted_span) in forms.normalized:
             return True
 
         # Try case-insensitive match
-        if quoted_span.lower() in code_snippet.lower():
+        if quoted_span.lower() in forms.lowered:
             return True
 
         # Try to find partial matches (for multi-line quotes)
         quote_lines = [line.strip() for line in quoted_span.split("\n") if line.strip()]
-        code_lines = [line.strip() for line in code_snippet.split("\n") if line.strip()]
 
         if len(quote_lines) > 1:
             # Multi-line quote: check if all lines appear in order
-            code_text = "\n".join(code_lines)
             quote_text_combined = "\n".join(quote_lines)
 
-            if quote_text_combined in code_text:
+            if quote_text_combined in forms.stripped_lines:
                 return True
 
             # Try with normalized whitespace
-            normalized_quote_text = re.sub(r"\s+", " ", quote_text_combined)
-            normalized_code_text = re.sub(r"\s+", " ", code_text)
-            if normalized_quote_text in normalized_code_text:
+            normalized_quote_text = _WHITESPACE_RE.sub(" ", quote_text_combined)
+            if normalized_quote_text in forms.normalized_lines:
                 return True
 
         return False
@@ -3,6 +3,7 @@
 import asyncio
 import hashlib
 import logging
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any, Optional
 import numpy as np
@@ -12,6 +13,10 @@ from app.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Query embeddings keyed by SHA-256 of (model, text). Shared across service
+# instances, which are created per request; only touched from the event loop.
+_query_embedding_cache: "OrderedDict[bytes, list[float]]" = OrderedDict()
+
 
 @dataclass
 class CodeChunk:
@@ -32,6 +37,7 @@ class EmbeddingService:
     CHUNK_MAX_TOKENS = 500
     EMBEDDING_DIMENSIONS = 768  # Gemini embedding dimension
     BATCH_SIZE = 20  # Embed this many chunks at once
+    QUERY_CACHE_SIZE = 2048  # Most recent query embeddings kept in memory
 
     def __init__(self, llm_service=None):
         """Initialize embedding service."""
@@ -181,10 +187,18 @@ class EmbeddingService:
         raise last_error
 
     async def embed_query(self, query: str) -> Optional[list[float]]:
-        """Generate embedding for a search query."""
+        """Generate embedding for a search query, reusing recent results."""
         if not self.client:
             return None
 
+        key = hashlib.sha256(
+            f"{settings.gemini_embedding_model}\0{query}".encode()
+        ).digest()
+        cached = _query_embedding_cache.get(key)
+        if cached is not None:
+            _query_embedding_cache.move_to_end(key)
+            return cached
+
         try:
             result = await asyncio.to_thread(
                 self.client.models.embed_content,
@@ -193,7 +207,11 @@ class EmbeddingService:
             )
             
             if hasattr(result, 'embeddings') and result.embeddings:
-                return result.embeddings[0].values
+                embedding = list(result.embeddings[0].values)
+                _query_embedding_cache[key] = embedding
+                if len(_query_embedding_cache) > self.QUERY_CACHE_SIZE:
+                    _query_embedding_cache.popitem(last=False)
+                return embedding
             return None
             
         except Exception as e:
@@ -1,5 +1,6 @@
 """GitHub service with secure ASKPASS cloning."""
 
+import asyncio
 import hashlib
 import hmac
 import os
@@ -61,6 +62,8 @@ class GitHubService:
         self.client_secret = settings.github_client_secret
         self.webhook_secret = settings.github_webhook_secret
         self._installation_tokens: dict[int, tuple[str, float]] = {}
+        # Serializes token refreshes so concurrent API calls mint one token
+        self._token_lock = asyncio.Lock()
 
     # =========================================================================
     # OAuth Flow
@@ -181,14 +184,28 @@ class GitHubService:
         Returns:
             Installation access token
         """
-        # Check cache
+        token = self._cached_installation_token(installation_id)
+        if token:
+            return token
+
+        async with self._token_lock:
+            # Another caller may have refreshed the token while we waited
+            token = self._cached_installation_token(installation_id)
+            if token:
+                return token
+            return await self._create_installation_token(installation_id)
+
+    def _cached_installation_token(self, installation_id: int) -> str | None:
+        """Return the cached installation token if it is not about to expire."""
         cached = self._installation_tokens.get(installation_id)
         if cached:
             token, expires = cached
             if time.time() < expires - 300:  # 5 min buffer
                 return token
+        return None
 
-        # Get new token
+    async def _create_installation_token(self, installation_id: int) -> str:
+        """Mint and cache a new installation access token."""
         app_jwt = self._create_app_jwt()
         async with httpx.AsyncClient() as client:
             response = await client.post(
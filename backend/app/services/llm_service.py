@@ -202,13 +202,17 @@ class LLMService:
         max_tokens: int = 1500,
         temperature: float = 0.3,
         system_prompt: str | None = None,
+        json_mode: bool = False,
     ) -> tuple[str, dict[str, int]]:
         """Generate text and return usage stats with retry and circuit breaker.
 
+        With json_mode, the model is constrained to emit a JSON document.
+
         Returns:
             Tuple of (generated_text, usage_dict) where usage_dict contains:
             - input_tokens
             - output_tokens
+            - cached_input_tokens
 
         Raises:
             LLMCircuitOpenError: If circuit breaker is open
@@ -224,6 +228,7 @@ class LLMService:
                     max_output_tokens=max_tokens,
                     temperature=temperature,
                     system_instruction=system_prompt,
+                    response_mime_type="application/json" if json_mode else None,
                 )
 
                 response = await asyncio.wait_for(
@@ -247,6 +252,12 @@ class LLMService:
                         "output_tokens": (
                             usage_metadata.candidates_token_count if usage_metadata else 0
                         ),
+                        # Prompt tokens served from Gemini's implicit prefix cache
+                        "cached_input_tokens": (
+                            usage_metadata.cached_content_token_count or 0
+                            if usage_metadata
+                            else 0
+                        ),
                     },
                 )
 
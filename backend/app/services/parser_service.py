@@ -1,25 +1,202 @@
 """Service for parsing code with tree-sitter AST."""
 
+import hashlib
 import logging
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import cache, lru_cache
 from pathlib import Path
 from typing import Optional
 
+from app.services.ast_cache import AstCache
+
 logger = logging.getLogger(__name__)
 
 # Try to import tree-sitter, gracefully handle if not installed
 try:
-    import tree_sitter_python
+    import tree_sitter
     import tree_sitter_javascript
+    import tree_sitter_python
     import tree_sitter_typescript
     TREE_SITTER_AVAILABLE = True
 except ImportError:
     TREE_SITTER_AVAILABLE = False
     logger.warning("tree-sitter not installed. Using fallback regex parsing.")
 
+# Regex fallback patterns, compiled once at import
+_PY_CLASS_RE = re.compile(r'^class\s+(\w+)')
+_PY_FUNC_RE = re.compile(r'^(\s*)def\s+(\w+)\s*\(([^)]*)\)')
+_PY_IMPORT_RE = re.compile(r'^import\s+(\S+)')
+_PY_FROM_IMPORT_RE = re.compile(r'^from\s+(\S+)\s+import\s+(.+)')
 
-@dataclass
+# The fused fallback scanners run on RE2 when google-re2 is installed: it
+# matches in linear time, so hostile or huge inputs cannot backtrack. RE2 has
+# no lookaround and an ASCII-only \w, so the patterns below avoid lookaround
+# and spell out word characters.
+try:
+    import re2 as _scan_re
+    _WORD = r'[\p{L}\p{N}_]'
+except ImportError:
+    _scan_re = re
+    _WORD = r'\w'
+
+# Fused alternations run once over the whole buffer and dispatched on
+# Match.lastgroup. [^\S\n] keeps every match on a single line.
+_JS_ANY_RE = _scan_re.compile(
+    rf'class[^\S\n]+(?P<class_name>{_WORD}+)'
+    rf'|function[^\S\n]+(?P<func_name>{_WORD}+)'
+    rf'|(?:const|let|var)[^\S\n]+(?P<arrow_name>{_WORD}+)'
+    r'[^\S\n]*=[^\S\n]*(?:async[^\S\n]*)?\('
+    r"|import[^\S\n]+.*[^\S\n]+from[^\S\n]+['\"](?P<module>[^'\"\n]+)['\"]"
+)
+# Group names must be unique, so arrow functions report as func_name
+_JS_GROUP_ALIASES = {"arrow_name": "func_name"}
+_GENERIC_ANY_RE = _scan_re.compile(
+    rf'class[^\S\n]+(?P<class_name>{_WORD}+)'
+    rf'|(?:function|def|func|fn)[^\S\n]+(?P<func_name>{_WORD}+)'
+)
+
+# Literal keywords that every alternative of the patterns above starts with
+_JS_KEYWORDS = ("class", "function", "const", "let", "var", "import")
+_GENERIC_KEYWORDS = ("class", "def", "func", "fn")  # "func" also anchors "function"
+
+
+@lru_cache(maxsize=8192)
+def _decode_name(span: bytes) -> str:
+    """Decode an identifier-like span, sharing one str per distinct value.
+
+    Names, modules and callees repeat heavily across a repository and are
+    kept on every parse record, so deduplicating them cuts retained memory.
+    """
+    return span.decode()
+
+
+# Default and named import bindings, matched natively by tree-sitter.
+# Namespace imports (``* as ns``) are deliberately not captured.
+_JS_IMPORT_QUERY = """
+(import_statement source: (string) @source) @import
+(import_statement (import_clause (identifier) @name))
+(import_statement
+  (import_clause (named_imports (import_specifier name: (_) @name))))
+"""
+
+
+class _FallbackResult(tuple):
+    """Regex fallback output for a file tree-sitter should have parsed.
+
+    Kept out of the AST cache, so the file is parsed properly once
+    tree-sitter works again.
+    """
+
+
+def _start_byte(node) -> int:
+    return node.start_byte
+
+
+@cache
+def _load_languages() -> dict:
+    """Load the tree-sitter grammars once per process, keyed by language name."""
+    languages = {}
+    if TREE_SITTER_AVAILABLE:
+        try:
+            languages["python"] = tree_sitter.Language(tree_sitter_python.language())
+            languages["javascript"] = tree_sitter.Language(tree_sitter_javascript.language())
+            languages["typescript"] = tree_sitter.Language(
+                tree_sitter_typescript.language_typescript()
+            )
+            logger.info(f"Initialized tree-sitter parsers: {list(languages.keys())}")
+        except Exception as e:
+            logger.warning(f"Failed to initialize tree-sitter: {e}")
+            languages = {}
+    return languages
+
+
+# tree_sitter.Parser keeps per-parse state, so each thread gets its own
+_parser_local = threading.local()
+
+
+def _get_parser(language: str):
+    """Return this thread's parser for a language, creating it on first use."""
+    parsers = getattr(_parser_local, "parsers", None)
+    if parsers is None:
+        parsers = _parser_local.parsers = {}
+    parser = parsers.get(language)
+    if parser is None:
+        parser = parsers[language] = tree_sitter.Parser(_load_languages()[language])
+    return parser
+
+
+# Scope marker for cursor walks: do not enter the current node's children
+_NO_DESCEND = object()
+
+
+def _find_matches(pattern, content: str, keywords: tuple[str, ...]):
+    """Yield the same non-overlapping matches as pattern.finditer(content).
+
+    RE2 scans the whole buffer in one linear pass and is used as is. The
+    backtracking re engine would try the pattern at every offset, so there
+    the keywords are located with str.find (a memchr-backed C search) and
+    the pattern is only tried at those anchors.
+    """
+    if _scan_re is not re:
+        yield from pattern.finditer(content)
+        return
+
+    find = content.find
+    anchors = set()
+    for keyword in keywords:
+        pos = find(keyword)
+        while pos != -1:
+            anchors.add(pos)
+            pos = find(keyword, pos + 1)
+
+    match_at = pattern.match
+    end = 0
+    for pos in sorted(anchors):
+        if pos >= end:
+            match = match_at(content, pos)
+            if match:
+                end = match.end()
+                yield match
+
+
+def _iter_line_matches(
+    pattern,
+    content: str,
+    keywords: tuple[str, ...],
+    aliases: dict[str, str] | None = None,
+):
+    """Yield (line_num, {group: text}) with the first match of each group per line.
+
+    Matches arrive in buffer order; line numbers advance by counting
+    newlines between consecutive matches, so lines are never split.
+    Groups listed in aliases are reported under the aliased name.
+    """
+    line_num = 1
+    pos = 0
+    current_line = 0
+    found: dict[str, str] = {}
+    for match in _find_matches(pattern, content, keywords):
+        start = match.start()
+        line_num += content.count('\n', pos, start)
+        pos = start
+        if line_num != current_line:
+            if found:
+                yield current_line, found
+            current_line = line_num
+            found = {}
+        group = match.lastgroup
+        kind = aliases.get(group, group) if aliases else group
+        if kind not in found:
+            found[kind] = match[group]
+    if found:
+        yield current_line, found
+
+
+@dataclass(slots=True)
 class Symbol:
     """A code symbol (class, function, method, variable)."""
     type: str  # class, function, method, variable, constant, import
@@ -36,7 +213,7 @@ class Symbol:
     body: Optional[str] = None  # Full source code of the symbol
 
 
-@dataclass
+@dataclass(slots=True)
 class Import:
     """An import statement."""
     file_path: str
@@ -47,7 +224,7 @@ class Import:
     imported_names: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionCall:
     """A function/method call."""
     file_path: str
@@ -93,29 +270,46 @@ class ParserService:
     }
     SKIP_FILES = {".min.js", ".bundle.js", ".map"}
 
-    def __init__(self):
-        """Initialize parsers for each language."""
-        self.parsers = {}
+    # Minified/generated detection: a full first chunk whose average line
+    # length exceeds the limit is skipped without being parsed
+    GENERATED_PREFILTER_BYTES = 64 * 1024
+    GENERATED_MAX_AVG_LINE_LENGTH = 500
+
+    # A NUL byte within this prefix marks the file as binary
+    BINARY_SNIFF_BYTES = 8192
+
+    # Regex fallback parsing is line-oriented; skip anything larger outright
+    MAX_FALLBACK_FILE_SIZE = 2 * 1024 * 1024
+
+    # Upper bound on parse threads; also capped by the CPU count
+    MAX_PARSE_WORKERS = 8
+
+    # Files are read and parsed in batches capped by count and total size,
+    # bounding how much source and parse output is held at once
+    PARSE_BATCH_FILES = 256
+    PARSE_BATCH_BYTES = 16 * 1024 * 1024
+
+    # Compiled tree-sitter queries, keyed by (language, query source).
+    # Shared across instances so each query is compiled once per process.
+    _QUERY_CACHE: dict[tuple[str, str], object] = {}
+
+    def __init__(self, ast_cache: AstCache | None = None):
+        """Initialize the service.
         
-        if TREE_SITTER_AVAILABLE:
-            try:
-                import tree_sitter
-                
-                # Initialize Python parser
-                self.python_language = tree_sitter.Language(tree_sitter_python.language())
-                self.parsers["python"] = tree_sitter.Parser(self.python_language)
-                
-                # Initialize JavaScript parser
-                self.js_language = tree_sitter.Language(tree_sitter_javascript.language())
-                self.parsers["javascript"] = tree_sitter.Parser(self.js_language)
-                
-                # Initialize TypeScript parser
-                self.ts_language = tree_sitter.Language(tree_sitter_typescript.language_typescript())
-                self.parsers["typescript"] = tree_sitter.Parser(self.ts_language)
-                
-                logger.info(f"Initialized tree-sitter parsers: {list(self.parsers.keys())}")
-            except Exception as e:
-                logger.warning(f"Failed to initialize tree-sitter: {e}")
+        Args:
+            ast_cache: Optional persistent cache of tree-sitter parse results
+        """
+        self.languages = dict(_load_languages())
+        self.ast_cache = ast_cache
+
+    def _get_query(self, language: str, source: str):
+        """Return a compiled tree-sitter query, compiling it at most once per process."""
+        key = (language, source)
+        query = self._QUERY_CACHE.get(key)
+        if query is None:
+            query = tree_sitter.Query(self.languages[language], source)
+            self._QUERY_CACHE[key] = query
+        return query
 
     def parse_repository(self, repo_path: str, coverage_service=None) -> ParseResult:
         """Parse all code files in repository.
@@ -125,6 +319,32 @@ class ParserService:
             coverage_service: Optional CoverageService to track coverage
         """
         result = ParseResult()
+        workers = max(1, min(self.MAX_PARSE_WORKERS, os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            self._walk_and_parse(repo_path, result, coverage_service, pool)
+
+        logger.info(
+            f"Parsed {result.files_parsed} files: "
+            f"{len(result.symbols)} symbols, {len(result.imports)} imports, "
+            f"{len(result.calls)} calls, {len(result.parse_errors)} errors"
+        )
+
+        return result
+
+    def _walk_and_parse(
+        self,
+        repo_path: str,
+        result: ParseResult,
+        coverage_service,
+        pool: ThreadPoolExecutor,
+    ) -> None:
+        """Read files in walk order and parse them in bounded batches.
+
+        Only one batch of decoded sources and parse results is held at a time,
+        so peak memory follows the batch size rather than the repository size.
+        """
+        pending: list[tuple[str, str, str]] = []
+        pending_bytes = 0
         
         for root, dirs, files in os.walk(repo_path):
             # Skip unwanted directories
@@ -162,34 +382,121 @@ class ParserService:
                         coverage_service.record_file_skipped(rel_path, "unsupported_language")
                     continue
                 
+                language = self.SUPPORTED_LANGUAGES[ext]
+
                 try:
-                    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                        content = f.read()
-                    
-                    language = self.SUPPORTED_LANGUAGES[ext]
-                    symbols, imports, calls = self.parse_file(rel_path, content, language)
+                    with open(file_path, 'rb') as f:
+                        if (
+                            language not in self.languages
+                            and os.fstat(f.fileno()).st_size > self.MAX_FALLBACK_FILE_SIZE
+                        ):
+                            if coverage_service:
+                                coverage_service.record_file_skipped(rel_path, "too_large")
+                            continue
+
+                        head = f.read(self.GENERATED_PREFILTER_BYTES)
+                        if head.find(b"\x00", 0, self.BINARY_SNIFF_BYTES) != -1:
+                            if coverage_service:
+                                coverage_service.record_file_skipped(rel_path, "binary")
+                            continue
+                        if self._looks_generated(head):
+                            if coverage_service:
+                                coverage_service.record_file_skipped(rel_path, "looks_generated")
+                            continue
+
+                        raw = head + f.read()
                     
-                    result.symbols.extend(symbols)
-                    result.imports.extend(imports)
-                    result.calls.extend(calls)
-                    result.files_parsed += 1
+                    content = raw.decode('utf-8', errors='replace')
+                    if '\r' in content:
+                        # Match text-mode universal newline handling
+                        content = content.replace('\r\n', '\n').replace('\r', '\n')
                     
-                    if coverage_service:
-                        coverage_service.record_file_parsed(rel_path, language)
+                    pending.append((rel_path, content, language))
+                    pending_bytes += len(raw)
                     
                 except Exception as e:
-                    error_msg = f"{rel_path}: {str(e)}"
-                    result.parse_errors.append(error_msg)
-                    if coverage_service:
-                        coverage_service.record_parse_error(rel_path, str(e))
+                    self._record_parse_error(result, coverage_service, rel_path, e)
+                    continue
+
+                if (
+                    len(pending) >= self.PARSE_BATCH_FILES
+                    or pending_bytes >= self.PARSE_BATCH_BYTES
+                ):
+                    self._parse_pending(pending, result, coverage_service, pool)
+                    pending = []
+                    pending_bytes = 0
         
-        logger.info(
-            f"Parsed {result.files_parsed} files: "
-            f"{len(result.symbols)} symbols, {len(result.imports)} imports, "
-            f"{len(result.calls)} calls, {len(result.parse_errors)} errors"
-        )
+        self._parse_pending(pending, result, coverage_service, pool)
+
+    def _parse_pending(
+        self,
+        pending: list[tuple[str, str, str]],
+        result: ParseResult,
+        coverage_service,
+        pool: ThreadPoolExecutor,
+    ) -> None:
+        """Parse one batch of (rel_path, content, language) entries into result, in order.
         
-        return result
+        tree-sitter releases the GIL while parsing, so cache misses are parsed
+        on the thread pool. Cache reads and writes stay on this thread, which
+        owns the SQLite connection; the batch's entries are flushed at the end.
+        """
+        digests: list[bytes | None] = [None] * len(pending)
+        parsed: dict[int, tuple] = {}
+        if self.ast_cache is not None:
+            for i, (rel_path, content, language) in enumerate(pending):
+                if language in self.languages:
+                    digests[i] = hashlib.sha256(content.encode()).digest()
+                    cached = self.ast_cache.get(rel_path, digests[i])
+                    if cached is not None:
+                        parsed[i] = cached
+
+        futures = {
+            i: pool.submit(self._parse_content, *pending[i])
+            for i in range(len(pending))
+            if i not in parsed
+        }
+
+        for i, (rel_path, _, language) in enumerate(pending):
+            if i in futures:
+                try:
+                    parsed[i] = futures[i].result()
+                except Exception as e:
+                    self._record_parse_error(result, coverage_service, rel_path, e)
+                    continue
+                if digests[i] is not None and not isinstance(parsed[i], _FallbackResult):
+                    self.ast_cache.put(rel_path, digests[i], *parsed[i])
+
+            symbols, imports, calls = parsed[i]
+            result.symbols.extend(symbols)
+            result.imports.extend(imports)
+            result.calls.extend(calls)
+            result.files_parsed += 1
+
+            if coverage_service:
+                coverage_service.record_file_parsed(rel_path, language)
+
+        if self.ast_cache is not None:
+            self.ast_cache.flush()
+
+    def _record_parse_error(
+        self, result: ParseResult, coverage_service, rel_path: str, error: Exception
+    ) -> None:
+        """Record a file that failed to read or parse."""
+        result.parse_errors.append(f"{rel_path}: {str(error)}")
+        if coverage_service:
+            coverage_service.record_parse_error(rel_path, str(error))
+
+    def _looks_generated(self, head: bytes) -> bool:
+        """Detect minified/generated content from the first chunk of a file.
+
+        bytes.count runs as a memchr-style C loop, so this stays cheap even
+        for files that would be expensive to parse.
+        """
+        if len(head) < self.GENERATED_PREFILTER_BYTES:
+            return False
+        newlines = head.count(b"\n")
+        return len(head) / max(newlines, 1) > self.GENERATED_MAX_AVG_LINE_LENGTH
 
     def parse_file(
         self, 
@@ -197,7 +504,30 @@ class ParserService:
         content: str, 
         language: str
     ) -> tuple[list[Symbol], list[Import], list[FunctionCall]]:
-        """Parse a single file."""
+        """Parse a single file, reusing cached results for unchanged content."""
+        # Only tree-sitter results are cached; the regex fallbacks are cheap
+        if self.ast_cache is None or language not in self.languages:
+            return self._parse_content(file_path, content, language)
+
+        digest = hashlib.sha256(content.encode()).digest()
+        cached = self.ast_cache.get(file_path, digest)
+        if cached is not None:
+            return cached
+
+        parsed = self._parse_content(file_path, content, language)
+        if not isinstance(parsed, _FallbackResult):
+            self.ast_cache.put(file_path, digest, *parsed)
+            # Single-file parses have no end-of-run flush; don't leave the write open
+            self.ast_cache.commit()
+        return parsed
+
+    def _parse_content(
+        self,
+        file_path: str,
+        content: str,
+        language: str
+    ) -> tuple[list[Symbol], list[Import], list[FunctionCall]]:
+        """Dispatch to the language-specific parser."""
         if language == "python":
             return self._parse_python(file_path, content)
         elif language in ("javascript", "typescript"):
@@ -216,9 +546,9 @@ class ParserService:
         imports = []
         calls = []
         
-        if "python" in self.parsers:
+        if "python" in self.languages:
             try:
-                parser = self.parsers["python"]
+                parser = _get_parser("python")
                 tree = parser.parse(content.encode())
                 content_bytes = content.encode()
                 
@@ -228,7 +558,7 @@ class ParserService:
                 
             except Exception as e:
                 logger.warning(f"Tree-sitter parse failed for {file_path}: {e}")
-                symbols, imports, calls = self._parse_python_fallback(file_path, content)
+                return _FallbackResult(self._parse_python_fallback(file_path, content))
         else:
             symbols, imports, calls = self._parse_python_fallback(file_path, content)
         
@@ -244,12 +574,18 @@ class ParserService:
         """Extract symbols from Python AST node."""
         symbols = []
         
-        for child in node.children:
-            if child.type == "class_definition":
+        # Explicit stack of (node, parent) instead of recursion; children are
+        # pushed in reverse so nodes are visited in source order.
+        stack = [(child, parent) for child in reversed(node.children)]
+        while stack:
+            child, parent = stack.pop()
+
+            node_type = child.type
+            if node_type == "class_definition":
                 # Extract class
                 name_node = child.child_by_field_name("name")
                 if name_node:
-                    name = content_bytes[name_node.start_byte:name_node.end_byte].decode()
+                    name = _decode_name(content_bytes[name_node.start_byte:name_node.end_byte])
                     qualified_name = f"{file_path}:{name}" if not parent else f"{parent}.{name}"
                     
                     # Get body for methods
@@ -260,7 +596,11 @@ class ParserService:
                             if stmt.type == "function_definition":
                                 method_name_node = stmt.child_by_field_name("name")
                                 if method_name_node:
-                                    method_name = content_bytes[method_name_node.start_byte:method_name_node.end_byte].decode()
+                                    method_name = _decode_name(
+                                        content_bytes[
+                                            method_name_node.start_byte:method_name_node.end_byte
+                                        ]
+                                    )
                                     methods.append(method_name)
                     
                     # Get docstring
@@ -270,29 +610,29 @@ class ParserService:
                     body_source = content_bytes[child.start_byte:child.end_byte].decode()
                     
                     symbols.append(Symbol(
-                        type="class",
-                        name=name,
-                        qualified_name=qualified_name,
-                        file_path=file_path,
-                        line_start=child.start_point[0] + 1,
-                        line_end=child.end_point[0] + 1,
-                        signature=None,
-                        docstring=docstring,
-                        parent=parent,
-                        children=methods,
-                        visibility="public" if not name.startswith("_") else "private",
-                        body=body_source,
+                        "class",
+                        name,
+                        qualified_name,
+                        file_path,
+                        child.start_point[0] + 1,
+                        child.end_point[0] + 1,
+                        None,
+                        docstring,
+                        parent,
+                        methods,
+                        "private" if name[:1] == "_" else "public",
+                        body_source,
                     ))
                     
-                    # Recursively extract methods
+                    # Extract methods
                     if body:
-                        symbols.extend(self._extract_python_symbols(body, content_bytes, file_path, qualified_name))
+                        stack.extend((stmt, qualified_name) for stmt in reversed(body.children))
             
-            elif child.type == "function_definition":
+            elif node_type == "function_definition":
                 # Extract function/method
                 name_node = child.child_by_field_name("name")
                 if name_node:
-                    name = content_bytes[name_node.start_byte:name_node.end_byte].decode()
+                    name = _decode_name(content_bytes[name_node.start_byte:name_node.end_byte])
                     qualified_name = f"{file_path}:{name}" if not parent else f"{parent}.{name}"
                     
                     # Get signature
@@ -317,30 +657,30 @@ class ParserService:
                     body_source = content_bytes[child.start_byte:child.end_byte].decode()
                     
                     symbol_type = "method" if parent else "function"
-                    visibility = "public"
-                    if name.startswith("__") and name.endswith("__"):
-                        visibility = "magic"
-                    elif name.startswith("_"):
-                        visibility = "private"
+                    visibility = (
+                        "magic" if name[:2] == "__" == name[-2:]
+                        else "private" if name[:1] == "_"
+                        else "public"
+                    )
                     
                     symbols.append(Symbol(
-                        type=symbol_type,
-                        name=name,
-                        qualified_name=qualified_name,
-                        file_path=file_path,
-                        line_start=child.start_point[0] + 1,
-                        line_end=child.end_point[0] + 1,
-                        signature=signature,
-                        docstring=docstring,
-                        parent=parent,
-                        children=[],
-                        visibility=visibility,
-                        body=body_source,
+                        symbol_type,
+                        name,
+                        qualified_name,
+                        file_path,
+                        child.start_point[0] + 1,
+                        child.end_point[0] + 1,
+                        signature,
+                        docstring,
+                        parent,
+                        [],
+                        visibility,
+                        body_source,
                     ))
             
             else:
-                # Recurse into other nodes
-                symbols.extend(self._extract_python_symbols(child, content_bytes, file_path, parent))
+                # Descend into other nodes
+                stack.extend((grandchild, parent) for grandchild in reversed(child.children))
         
         return symbols
 
@@ -372,34 +712,41 @@ class ParserService:
         """Extract imports from Python AST."""
         imports = []
         
-        for child in node.children:
-            if child.type == "import_statement":
+        stack = list(reversed(node.children))
+        while stack:
+            child = stack.pop()
+
+            node_type = child.type
+            if node_type == "import_statement":
                 # import x, y, z
                 for name_node in child.children:
-                    if name_node.type == "dotted_name":
-                        module = content_bytes[name_node.start_byte:name_node.end_byte].decode()
+                    name_type = name_node.type
+                    if name_type == "dotted_name":
+                        module = _decode_name(
+                            content_bytes[name_node.start_byte:name_node.end_byte]
+                        )
                         imports.append(Import(
-                            file_path=file_path,
-                            line=child.start_point[0] + 1,
-                            module=module,
-                            alias=None,
-                            is_from_import=False,
+                            file_path,
+                            child.start_point[0] + 1,
+                            module,
+                            None,
+                            False,
                         ))
-                    elif name_node.type == "aliased_import":
+                    elif name_type == "aliased_import":
                         name = name_node.child_by_field_name("name")
                         alias = name_node.child_by_field_name("alias")
                         if name:
-                            module = content_bytes[name.start_byte:name.end_byte].decode()
+                            module = _decode_name(content_bytes[name.start_byte:name.end_byte])
                             alias_str = content_bytes[alias.start_byte:alias.end_byte].decode() if alias else None
                             imports.append(Import(
-                                file_path=file_path,
-                                line=child.start_point[0] + 1,
-                                module=module,
-                                alias=alias_str,
-                                is_from_import=False,
+                                file_path,
+                                child.start_point[0] + 1,
+                                module,
+                                alias_str,
+                                False,
                             ))
             
-            elif child.type == "import_from_statement":
+            elif node_type == "import_from_statement":
                 # from x import y, z
                 module_node = child.child_by_field_name("module_name")
                 if module_node:
@@ -410,29 +757,30 @@ class ParserService:
                 
                 imported_names = []
                 for name_node in child.children:
-                    if name_node.type == "dotted_name":
+                    name_type = name_node.type
+                    if name_type == "dotted_name":
                         imported_names.append(
-                            content_bytes[name_node.start_byte:name_node.end_byte].decode()
+                            _decode_name(content_bytes[name_node.start_byte:name_node.end_byte])
                         )
-                    elif name_node.type == "aliased_import":
+                    elif name_type == "aliased_import":
                         name = name_node.child_by_field_name("name")
                         if name:
                             imported_names.append(
-                                content_bytes[name.start_byte:name.end_byte].decode()
+                                _decode_name(content_bytes[name.start_byte:name.end_byte])
                             )
                 
                 imports.append(Import(
-                    file_path=file_path,
-                    line=child.start_point[0] + 1,
-                    module=module,
-                    alias=None,
-                    is_from_import=True,
-                    imported_names=imported_names,
+                    file_path,
+                    child.start_point[0] + 1,
+                    module,
+                    None,
+                    True,
+                    imported_names,
                 ))
             
             else:
-                # Recurse
-                imports.extend(self._extract_python_imports(child, content_bytes, file_path))
+                # Descend
+                stack.extend(reversed(child.children))
         
         return imports
 
@@ -446,27 +794,30 @@ class ParserService:
         """Extract function calls from Python AST."""
         calls = []
         
-        for child in node.children:
+        stack = [(child, current_func) for child in reversed(node.children)]
+        while stack:
+            child, current_func = stack.pop()
+
             # Track current function context
-            if child.type == "function_definition":
+            node_type = child.type
+            if node_type == "function_definition":
                 name_node = child.child_by_field_name("name")
                 if name_node:
                     func_name = content_bytes[name_node.start_byte:name_node.end_byte].decode()
                     body = child.child_by_field_name("body")
                     if body:
-                        calls.extend(self._extract_python_calls(
-                            body, content_bytes, file_path, 
-                            f"{file_path}:{func_name}"
-                        ))
+                        func_ctx = f"{file_path}:{func_name}"
+                        stack.extend((stmt, func_ctx) for stmt in reversed(body.children))
                 continue
             
-            elif child.type == "class_definition":
+            elif node_type == "class_definition":
                 name_node = child.child_by_field_name("name")
                 if name_node:
                     class_name = content_bytes[name_node.start_byte:name_node.end_byte].decode()
                     body = child.child_by_field_name("body")
                     if body:
                         # Process methods inside class
+                        method_bodies = []
                         for stmt in body.children:
                             if stmt.type == "function_definition":
                                 method_name_node = stmt.child_by_field_name("name")
@@ -474,26 +825,29 @@ class ParserService:
                                     method_name = content_bytes[method_name_node.start_byte:method_name_node.end_byte].decode()
                                     method_body = stmt.child_by_field_name("body")
                                     if method_body:
-                                        calls.extend(self._extract_python_calls(
-                                            method_body, content_bytes, file_path,
-                                            f"{file_path}:{class_name}.{method_name}"
-                                        ))
+                                        method_bodies.append(
+                                            (method_body, f"{file_path}:{class_name}.{method_name}")
+                                        )
+                        for method_body, method_ctx in reversed(method_bodies):
+                            stack.extend(
+                                (stmt, method_ctx) for stmt in reversed(method_body.children)
+                            )
                 continue
             
-            elif child.type == "call":
+            elif node_type == "call":
                 # Extract call target
                 func_node = child.child_by_field_name("function")
                 if func_node:
-                    callee = content_bytes[func_node.start_byte:func_node.end_byte].decode()
+                    callee = _decode_name(content_bytes[func_node.start_byte:func_node.end_byte])
                     calls.append(FunctionCall(
-                        file_path=file_path,
-                        line=child.start_point[0] + 1,
-                        caller=current_func or f"{file_path}:module",
-                        callee=callee,
+                        file_path,
+                        child.start_point[0] + 1,
+                        current_func or f"{file_path}:module",
+                        callee,
                     ))
             
-            # Recurse into other nodes
-            calls.extend(self._extract_python_calls(child, content_bytes, file_path, current_func))
+            # Descend into other nodes
+            stack.extend((grandchild, current_func) for grandchild in reversed(child.children))
         
         return calls
 
@@ -503,42 +857,42 @@ class ParserService:
         content: str
     ) -> tuple[list[Symbol], list[Import], list[FunctionCall]]:
         """Fallback regex-based Python parsing."""
-        import re
-        
         symbols = []
         imports = []
         calls = []
         lines = content.split('\n')
         
-        # Extract classes and functions with regex
-        class_pattern = re.compile(r'^class\s+(\w+)')
-        func_pattern = re.compile(r'^(\s*)def\s+(\w+)\s*\(([^)]*)\)')
-        import_pattern = re.compile(r'^import\s+(\S+)')
-        from_import_pattern = re.compile(r'^from\s+(\S+)\s+import\s+(.+)')
-        
+        # Qualified name of the enclosing class, shared by its methods as their
+        # parent, and the prefix their own qualified names are built from
         current_class = None
+        method_prefix = None
         
         for i, line in enumerate(lines):
             line_num = i + 1
             
             # Classes
-            match = class_pattern.match(line)
+            match = _PY_CLASS_RE.match(line)
             if match:
                 name = match.group(1)
-                current_class = name
+                current_class = f"{file_path}:{name}"
+                method_prefix = f"{current_class}."
                 symbols.append(Symbol(
-                    type="class",
-                    name=name,
-                    qualified_name=f"{file_path}:{name}",
-                    file_path=file_path,
-                    line_start=line_num,
-                    line_end=line_num,
-                    visibility="public" if not name.startswith("_") else "private",
+                    "class",
+                    name,
+                    current_class,
+                    file_path,
+                    line_num,
+                    line_num,
+                    None,
+                    None,
+                    None,
+                    [],
+                    "private" if name[:1] == "_" else "public",
                 ))
                 continue
             
             # Functions/methods
-            match = func_pattern.match(line)
+            match = _PY_FUNC_RE.match(line)
             if match:
                 indent = match.group(1)
                 name = match.group(2)
@@ -546,48 +900,53 @@ class ParserService:
                 
                 if indent and current_class:
                     # Method
-                    qualified_name = f"{file_path}:{current_class}.{name}"
+                    qualified_name = method_prefix + name
                     symbol_type = "method"
+                    parent = current_class
                 else:
                     # Top-level function
                     qualified_name = f"{file_path}:{name}"
                     symbol_type = "function"
-                    current_class = None
+                    parent = current_class = None
                 
                 symbols.append(Symbol(
-                    type=symbol_type,
-                    name=name,
-                    qualified_name=qualified_name,
-                    file_path=file_path,
-                    line_start=line_num,
-                    line_end=line_num,
-                    signature=f"def {name}({params})",
-                    parent=f"{file_path}:{current_class}" if current_class and indent else None,
-                    visibility="public" if not name.startswith("_") else "private",
+                    symbol_type,
+                    name,
+                    qualified_name,
+                    file_path,
+                    line_num,
+                    line_num,
+                    f"def {name}({params})",
+                    None,
+                    parent,
+                    [],
+                    "private" if name[:1] == "_" else "public",
                 ))
                 continue
             
             # Imports
-            match = import_pattern.match(line)
+            match = _PY_IMPORT_RE.match(line)
             if match:
                 imports.append(Import(
-                    file_path=file_path,
-                    line=line_num,
-                    module=match.group(1),
-                    is_from_import=False,
+                    file_path,
+                    line_num,
+                    match.group(1),
+                    None,
+                    False,
                 ))
                 continue
             
-            match = from_import_pattern.match(line)
+            match = _PY_FROM_IMPORT_RE.match(line)
             if match:
                 module = match.group(1)
                 names = [n.strip() for n in match.group(2).split(',')]
                 imports.append(Import(
-                    file_path=file_path,
-                    line=line_num,
-                    module=module,
-                    is_from_import=True,
-                    imported_names=names,
+                    file_path,
+                    line_num,
+                    module,
+                    None,
+                    True,
+                    names,
                 ))
         
         return symbols, imports, calls
@@ -603,20 +962,22 @@ class ParserService:
         imports = []
         calls = []
         
-        parser_key = language if language in self.parsers else "javascript"
+        parser_key = language if language in self.languages else "javascript"
         
-        if parser_key in self.parsers:
+        if parser_key in self.languages:
             try:
-                parser = self.parsers[parser_key]
+                parser = _get_parser(parser_key)
                 tree = parser.parse(content.encode())
                 content_bytes = content.encode()
                 
                 symbols = self._extract_js_symbols(tree.root_node, content_bytes, file_path)
-                imports = self._extract_js_imports(tree.root_node, content_bytes, file_path)
+                imports = self._extract_js_imports(
+                    tree.root_node, content_bytes, file_path, parser_key
+                )
                 
             except Exception as e:
                 logger.warning(f"Tree-sitter parse failed for {file_path}: {e}")
-                symbols, imports, calls = self._parse_js_fallback(file_path, content)
+                return _FallbackResult(self._parse_js_fallback(file_path, content))
         else:
             symbols, imports, calls = self._parse_js_fallback(file_path, content)
         
@@ -632,12 +993,28 @@ class ParserService:
         """Extract symbols from JavaScript AST."""
         symbols = []
         
-        for child in node.children:
+        # Walk with a TreeCursor, which steps through siblings in C instead of
+        # materializing a children list per node. scopes holds the parent for
+        # each cursor depth; a 1-tuple marks a class's children, of which only
+        # the body is entered (with the class as parent).
+        cursor = node.walk()
+        if not cursor.goto_first_child():
+            return symbols
+        scopes = [parent]
+        while True:
+            child = cursor.node
+            parent = scopes[-1]
+            child_scope = _NO_DESCEND
+
+            if type(parent) is tuple:
+                if cursor.field_name == "body":
+                    child_scope = parent[0]
+
             # Class declaration
-            if child.type == "class_declaration":
+            elif (node_type := child.type) == "class_declaration":
                 name_node = child.child_by_field_name("name")
                 if name_node:
-                    name = content_bytes[name_node.start_byte:name_node.end_byte].decode()
+                    name = _decode_name(content_bytes[name_node.start_byte:name_node.end_byte])
                     qualified_name = f"{file_path}:{name}"
                     
                     body = child.child_by_field_name("body")
@@ -648,32 +1025,35 @@ class ParserService:
                                 method_name = member.child_by_field_name("name")
                                 if method_name:
                                     methods.append(
-                                        content_bytes[method_name.start_byte:method_name.end_byte].decode()
+                                        _decode_name(content_bytes[method_name.start_byte:method_name.end_byte])
                                     )
                     
                     body_source = content_bytes[child.start_byte:child.end_byte].decode()
                     
                     symbols.append(Symbol(
-                        type="class",
-                        name=name,
-                        qualified_name=qualified_name,
-                        file_path=file_path,
-                        line_start=child.start_point[0] + 1,
-                        line_end=child.end_point[0] + 1,
-                        children=methods,
-                        visibility="public",
-                        body=body_source,
+                        "class",
+                        name,
+                        qualified_name,
+                        file_path,
+                        child.start_point[0] + 1,
+                        child.end_point[0] + 1,
+                        None,
+                        None,
+                        None,
+                        methods,
+                        "public",
+                        body_source,
                     ))
                     
                     # Extract methods
                     if body:
-                        symbols.extend(self._extract_js_symbols(body, content_bytes, file_path, qualified_name))
+                        child_scope = (qualified_name,)
             
             # Function declaration
-            elif child.type in ("function_declaration", "function"):
+            elif node_type == "function_declaration" or node_type == "function":
                 name_node = child.child_by_field_name("name")
                 if name_node:
-                    name = content_bytes[name_node.start_byte:name_node.end_byte].decode()
+                    name = _decode_name(content_bytes[name_node.start_byte:name_node.end_byte])
                     qualified_name = f"{file_path}:{name}" if not parent else f"{parent}.{name}"
                     
                     params = child.child_by_field_name("parameters")
@@ -682,26 +1062,33 @@ class ParserService:
                     body_source = content_bytes[child.start_byte:child.end_byte].decode()
                     
                     symbols.append(Symbol(
-                        type="function",
-                        name=name,
-                        qualified_name=qualified_name,
-                        file_path=file_path,
-                        line_start=child.start_point[0] + 1,
-                        line_end=child.end_point[0] + 1,
-                        signature=f"function {name}{params_str}",
-                        parent=parent,
-                        visibility="public",
-                        body=body_source,
+                        "function",
+                        name,
+                        qualified_name,
+                        file_path,
+                        child.start_point[0] + 1,
+                        child.end_point[0] + 1,
+                        f"function {name}{params_str}",
+                        None,
+                        parent,
+                        [],
+                        "public",
+                        body_source,
                     ))
             
             # Arrow function in variable
-            elif child.type == "lexical_declaration" or child.type == "variable_declaration":
+            elif node_type == "lexical_declaration" or node_type == "variable_declaration":
+                # Every declarator shares the declaration's source and lines
+                body_source = None
+                line_start = line_end = 0
                 for decl in child.children:
                     if decl.type == "variable_declarator":
                         name_node = decl.child_by_field_name("name")
                         value_node = decl.child_by_field_name("value")
                         if name_node and value_node and value_node.type == "arrow_function":
-                            name = content_bytes[name_node.start_byte:name_node.end_byte].decode()
+                            name = _decode_name(
+                                content_bytes[name_node.start_byte:name_node.end_byte]
+                            )
                             qualified_name = f"{file_path}:{name}"
                             
                             params = value_node.child_by_field_name("parameters")
@@ -711,25 +1098,33 @@ class ParserService:
                                 # Single param without parens
                                 params_str = "()"
                             
-                            body_source = content_bytes[child.start_byte:child.end_byte].decode()
+                            if body_source is None:
+                                body_source = (
+                                    content_bytes[child.start_byte:child.end_byte].decode()
+                                )
+                                line_start = child.start_point[0] + 1
+                                line_end = child.end_point[0] + 1
                             
                             symbols.append(Symbol(
-                                type="function",
-                                name=name,
-                                qualified_name=qualified_name,
-                                file_path=file_path,
-                                line_start=child.start_point[0] + 1,
-                                line_end=child.end_point[0] + 1,
-                                signature=f"const {name} = {params_str} =>",
-                                visibility="public",
-                                body=body_source,
+                                "function",
+                                name,
+                                qualified_name,
+                                file_path,
+                                line_start,
+                                line_end,
+                                f"const {name} = {params_str} =>",
+                                None,
+                                None,
+                                [],
+                                "public",
+                                body_source,
                             ))
             
             # Method definition
-            elif child.type == "method_definition":
+            elif node_type == "method_definition":
                 name_node = child.child_by_field_name("name")
                 if name_node:
-                    name = content_bytes[name_node.start_byte:name_node.end_byte].decode()
+                    name = _decode_name(content_bytes[name_node.start_byte:name_node.end_byte])
                     qualified_name = f"{parent}.{name}" if parent else f"{file_path}:{name}"
                     
                     params = child.child_by_field_name("parameters")
@@ -738,66 +1133,73 @@ class ParserService:
                     body_source = content_bytes[child.start_byte:child.end_byte].decode()
                     
                     symbols.append(Symbol(
-                        type="method",
-                        name=name,
-                        qualified_name=qualified_name,
-                        file_path=file_path,
-                        line_start=child.start_point[0] + 1,
-                        line_end=child.end_point[0] + 1,
-                        signature=f"{name}{params_str}",
-                        parent=parent,
-                        visibility="public",
-                        body=body_source,
+                        "method",
+                        name,
+                        qualified_name,
+                        file_path,
+                        child.start_point[0] + 1,
+                        child.end_point[0] + 1,
+                        f"{name}{params_str}",
+                        None,
+                        parent,
+                        [],
+                        "public",
+                        body_source,
                     ))
             
             else:
-                # Recurse
-                symbols.extend(self._extract_js_symbols(child, content_bytes, file_path, parent))
-        
-        return symbols
+                # Descend
+                child_scope = parent
+
+            if child_scope is not _NO_DESCEND and cursor.goto_first_child():
+                scopes.append(child_scope)
+                continue
+            while not cursor.goto_next_sibling():
+                scopes.pop()
+                if not scopes:
+                    return symbols
+                cursor.goto_parent()
 
     def _extract_js_imports(
         self, 
         node, 
         content_bytes: bytes, 
-        file_path: str
+        file_path: str,
+        language: str = "javascript"
     ) -> list[Import]:
         """Extract imports from JavaScript AST."""
-        imports = []
+        captures = tree_sitter.QueryCursor(
+            self._get_query(language, _JS_IMPORT_QUERY)
+        ).captures(node)
+        statements = sorted(captures.get("import", ()), key=_start_byte)
+        sources = sorted(captures.get("source", ()), key=_start_byte)
+        names = sorted(captures.get("name", ()), key=_start_byte)
         
-        for child in node.children:
-            if child.type == "import_statement":
-                source = child.child_by_field_name("source")
-                if source:
-                    module = content_bytes[source.start_byte:source.end_byte].decode()
-                    module = module.strip("'\"")
-                    
-                    imported_names = []
-                    for c in child.children:
-                        if c.type == "import_clause":
-                            for ic in c.children:
-                                if ic.type == "identifier":
-                                    imported_names.append(
-                                        content_bytes[ic.start_byte:ic.end_byte].decode()
-                                    )
-                                elif ic.type == "named_imports":
-                                    for spec in ic.children:
-                                        if spec.type == "import_specifier":
-                                            name = spec.child_by_field_name("name")
-                                            if name:
-                                                imported_names.append(
-                                                    content_bytes[name.start_byte:name.end_byte].decode()
-                                                )
-                    
-                    imports.append(Import(
-                        file_path=file_path,
-                        line=child.start_point[0] + 1,
-                        module=module,
-                        is_from_import=True,
-                        imported_names=imported_names,
-                    ))
-            else:
-                imports.extend(self._extract_js_imports(child, content_bytes, file_path))
+        # Imports never nest, so once each capture list is in document order
+        # names are assigned to statements by one merge over byte offsets.
+        imports = []
+        name_index = 0
+        for statement, source in zip(statements, sources):
+            imported_names = []
+            start_byte = statement.start_byte
+            end_byte = statement.end_byte
+            while name_index < len(names) and names[name_index].start_byte < end_byte:
+                name = names[name_index]
+                if name.start_byte >= start_byte:
+                    imported_names.append(
+                        _decode_name(content_bytes[name.start_byte:name.end_byte])
+                    )
+                name_index += 1
+
+            module = content_bytes[source.start_byte:source.end_byte].decode()
+            imports.append(Import(
+                file_path,
+                statement.start_point[0] + 1,
+                module.strip("'\""),
+                None,
+                True,
+                imported_names,
+            ))
         
         return imports
 
@@ -807,54 +1209,53 @@ class ParserService:
         content: str
     ) -> tuple[list[Symbol], list[Import], list[FunctionCall]]:
         """Fallback regex-based JavaScript parsing."""
-        import re
-        
         symbols = []
         imports = []
         calls = []
-        lines = content.split('\n')
-        
-        class_pattern = re.compile(r'class\s+(\w+)')
-        func_pattern = re.compile(r'(?:function\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s*)?\()')
-        import_pattern = re.compile(r"import\s+.*\s+from\s+['\"]([^'\"]+)['\"]")
         
-        for i, line in enumerate(lines):
-            line_num = i + 1
-            
-            match = class_pattern.search(line)
-            if match:
-                name = match.group(1)
+        for line_num, found in _iter_line_matches(
+            _JS_ANY_RE, content, _JS_KEYWORDS, _JS_GROUP_ALIASES
+        ):
+            name = found.get("class_name")
+            if name:
                 symbols.append(Symbol(
-                    type="class",
-                    name=name,
-                    qualified_name=f"{file_path}:{name}",
-                    file_path=file_path,
-                    line_start=line_num,
-                    line_end=line_num,
-                    visibility="public",
+                    "class",
+                    name,
+                    f"{file_path}:{name}",
+                    file_path,
+                    line_num,
+                    line_num,
+                    None,
+                    None,
+                    None,
+                    [],
+                    "public",
                 ))
             
-            match = func_pattern.search(line)
-            if match:
-                name = match.group(1) or match.group(2)
-                if name:
-                    symbols.append(Symbol(
-                        type="function",
-                        name=name,
-                        qualified_name=f"{file_path}:{name}",
-                        file_path=file_path,
-                        line_start=line_num,
-                        line_end=line_num,
-                        visibility="public",
-                    ))
+            name = found.get("func_name")
+            if name:
+                symbols.append(Symbol(
+                    "function",
+                    name,
+                    f"{file_path}:{name}",
+                    file_path,
+                    line_num,
+                    line_num,
+                    None,
+                    None,
+                    None,
+                    [],
+                    "public",
+                ))
             
-            match = import_pattern.search(line)
-            if match:
+            module = found.get("module")
+            if module:
                 imports.append(Import(
-                    file_path=file_path,
-                    line=line_num,
-                    module=match.group(1),
-                    is_from_import=True,
+                    file_path,
+                    line_num,
+                    module,
+                    None,
+                    True,
                 ))
         
         return symbols, imports, calls
@@ -866,41 +1267,30 @@ class ParserService:
         language: str
     ) -> tuple[list[Symbol], list[Import], list[FunctionCall]]:
         """Generic fallback for unsupported languages."""
-        import re
-        
         symbols = []
         imports = []
-        lines = content.split('\n')
-        
-        # Very basic patterns that work across languages
-        class_pattern = re.compile(r'class\s+(\w+)')
-        func_pattern = re.compile(r'(?:function|def|func|fn)\s+(\w+)')
         
-        for i, line in enumerate(lines):
-            line_num = i + 1
-            
-            match = class_pattern.search(line)
-            if match:
-                name = match.group(1)
+        for line_num, found in _iter_line_matches(_GENERIC_ANY_RE, content, _GENERIC_KEYWORDS):
+            name = found.get("class_name")
+            if name:
                 symbols.append(Symbol(
-                    type="class",
-                    name=name,
-                    qualified_name=f"{file_path}:{name}",
-                    file_path=file_path,
-                    line_start=line_num,
-                    line_end=line_num,
+                    "class",
+                    name,
+                    f"{file_path}:{name}",
+                    file_path,
+                    line_num,
+                    line_num,
                 ))
             
-            match = func_pattern.search(line)
-            if match:
-                name = match.group(1)
+            name = found.get("func_name")
+            if name:
                 symbols.append(Symbol(
-                    type="function",
-                    name=name,
-                    qualified_name=f"{file_path}:{name}",
-                    file_path=file_path,
-                    line_start=line_num,
-                    line_end=line_num,
+                    "function",
+                    name,
+                    f"{file_path}:{name}",
+                    file_path,
+                    line_num,
+                    line_num,
                 ))
         
         return symbols, imports, []
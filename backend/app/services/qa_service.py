@@ -1,22 +1,196 @@
 """Q&A service with proof-carrying answers."""
 
+import asyncio
+import hashlib
+import heapq
 import json
 import logging
 import re
+import uuid
+from collections import defaultdict
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from enum import Enum
+from functools import lru_cache
 from typing import Any
 
-from sqlalchemy import select, text
+import numpy as np
+from sqlalchemy import insert, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.models.answer import Answer
 from app.models.citation import Citation
 from app.models.repository import Repository
 from app.models.snippet_cache import SnippetCache
+from app.services.claim_validator import ClaimValidator
 
 logger = logging.getLogger(__name__)
 
+# orjson parses LLM responses several times faster; its JSONDecodeError
+# subclasses json.JSONDecodeError, so the handlers below cover both.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# json-repair recovers malformed answer JSON locally when installed
+try:
+    from json_repair import repair_json
+except ImportError:
+    repair_json = None
+
+
+def _json_loads(document: str) -> Any:
+    """Decode JSON with orjson, retrying with json for input only it accepts.
+
+    The stdlib also takes NaN/Infinity literals and integers beyond 64 bits.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(document)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(document)
+
+
+# Question words that carry no retrieval signal
+_STOPWORDS = frozenset({
+    "the", "a", "an", "is", "are", "was", "were", "be", "been",
+    "how", "what", "where", "when", "why", "which", "who",
+    "does", "do", "did", "has", "have", "had",
+    "in", "on", "at", "to", "for", "of", "with", "by",
+    "can", "could", "would", "should", "will",
+    "this", "that", "these", "those", "it", "its",
+    "and", "or", "but", "if", "then", "else",
+    "my", "your", "our", "their", "i", "you", "we", "they",
+})
+
+_FILE_PATH_RE = re.compile(r'[\w./\\-]+\.(?:php|py|js|ts|tsx|jsx|java|go|rs|rb)')
+_QUALIFIED_RE = re.compile(r'\b[\w]+(?:(?:::|\.|\\)[\w]+)+\b')
+_QUALIFIED_SEP_RE = re.compile(r'::|\\|\.')
+_DUNDER_RE = re.compile(r'__\w+__')
+_ALPHANUMERIC_RE = re.compile(r'\b[A-Za-z]+\d+\w*\b|\b\d+[A-Za-z]+\w*\b')
+_ALLCAPS_RE = re.compile(r'\b[A-Z]{2,}\b')
+_CAMEL_RE = re.compile(r'\b[a-z]+(?:[A-Z][a-z]+)+\b|\b[A-Z][a-z]+(?:[A-Z][a-z]+)+\b')
+_CAMEL_PART_RE = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?=[A-Z][a-z]|\d|\W|$)')
+_SNAKE_RE = re.compile(r'\b\w+(?:_\w+)+\b')
+_WORD_RE = re.compile(r'\b[A-Za-z][A-Za-z0-9]*\b')
+
+# Characters that change brace depth or string state when scanning for JSON
+_JSON_STRUCTURE_RE = re.compile(r'[{}"\\]')
+
+# Answer JSON extraction and repair
+_JSON_CODE_BLOCK_RE = re.compile(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```')
+# One pass over: a trailing comma before ] or } (group 1), an unquoted key
+# after { or , (groups 2-3), or a control character (no group)
+_JSON_REPAIR_RE = re.compile(r',\s*([\]}])|(\{|,)\s*(\w+)\s*:|[\x00-\x1f]')
+
+
+def _repair_match(match: re.Match) -> str:
+    """Replacement for one _JSON_REPAIR_RE match."""
+    if match.group(1):
+        return match.group(1)
+    if match.group(3):
+        return f'{match.group(2)}"{match.group(3)}":'
+    return ''
+
+
+def _question_hash(question: str) -> str:
+    """SHA-256 of the question with case and whitespace normalized."""
+    return hashlib.sha256(" ".join(question.lower().split()).encode()).hexdigest()
+
+
+def _slice_lines(content: str, start_line: int, end_line: int) -> str:
+    """Return lines start_line..end_line (1-indexed, inclusive) of content.
+
+    Walks newlines with str.find and stops at end_line, so a snippet near
+    the top of a large file does not split the whole file into lines.
+    """
+    first = max(1, start_line)
+    if end_line < first:
+        return ""
+
+    start = 0
+    for _ in range(first - 1):
+        start = content.find("\n", start) + 1
+        if not start:
+            return ""
+
+    end = start
+    for _ in range(end_line - first + 1):
+        end = content.find("\n", end) + 1
+        if not end:
+            return content[start:]
+    return content[start:end - 1]
+
+@lru_cache(maxsize=1024)
+def _extract_keywords(query: str) -> tuple[str, ...]:
+    """Extract keywords from a question; cached since identical questions recur."""
+    keywords = []
+    seen = set()
+
+    def add_keyword(kw: str) -> None:
+        """Add keyword if valid and not seen."""
+        if kw and kw.lower() not in _STOPWORDS and kw not in seen:
+            # Keep ALLCAPS as-is, otherwise lowercase for matching
+            seen.add(kw)
+            keywords.append(kw)
+
+    # Extract file paths (e.g., app/Http/Controllers/UserController.php)
+    for path in _FILE_PATH_RE.findall(query):
+        add_keyword(path)
+        # Also extract the filename without extension
+        filename = path.split('/')[-1].split('\\')[-1].rsplit('.', 1)[0]
+        add_keyword(filename)
+
+    # Extract qualified names (e.g., AuthService::login, App\Models\User)
+    for q in _QUALIFIED_RE.findall(query):
+        add_keyword(q)
+        # Also extract individual parts
+        for part in _QUALIFIED_SEP_RE.split(q):
+            if len(part) > 1:
+                add_keyword(part)
+
+    # Extract special Python/Ruby dunders (__init__, __call__, etc.)
+    for d in _DUNDER_RE.findall(query):
+        add_keyword(d)
+
+    # Extract tokens with digits (OAuth2, S3, v2, etc.) - preserve as-is
+    for an in _ALPHANUMERIC_RE.findall(query):
+        add_keyword(an)
+
+    # Extract ALLCAPS tokens (API, JWT, HTTP, etc.)
+    for ac in _ALLCAPS_RE.findall(query):
+        add_keyword(ac)
+
+    # Extract camelCase and PascalCase - keep original AND split parts
+    for camel in _CAMEL_RE.findall(query):
+        add_keyword(camel)
+        # Split camelCase into parts
+        for part in _CAMEL_PART_RE.findall(camel):
+            if len(part) > 2:
+                add_keyword(part)
+
+    # Extract snake_case - keep original AND split parts
+    for snake in _SNAKE_RE.findall(query):
+        add_keyword(snake)
+        for part in snake.split('_'):
+            if len(part) > 2:
+                add_keyword(part)
+
+    # Extract remaining meaningful words (not already captured)
+    for word in _WORD_RE.findall(query):
+        if len(word) > 2:
+            add_keyword(word)
+
+    # Prioritize: keep all keywords but limit total for query efficiency
+    # Sort by length (longer = more specific) then alphabetically
+    keywords.sort(key=lambda k: (-len(k), k.lower()))
+
+    return tuple(keywords[:10])  # Allow more keywords for better recall
+
 
 class ConfidenceTier(str, Enum):
     """Confidence tier for answers."""
@@ -85,7 +259,11 @@ class QAResult:
 class QAService:
     """Q&A service with proof-carrying answers."""
 
-    ANSWER_PROMPT = """You are a code analysis assistant. Answer the question based ONLY on the provided sources.
+    # Answer prompt, split around the question and sources so it is assembled
+    # by concatenation rather than a str.format scan of the whole template.
+    # The static instructions come first and the sources, which vary most,
+    # last, so provider-side prefix caching can reuse the instruction block.
+    _PROMPT_PREFIX = """You are a code analysis assistant. Answer the question based ONLY on the provided sources.
 
 CRITICAL RULES:
 1. You MUST output valid JSON matching the schema below
@@ -96,30 +274,43 @@ CRITICAL RULES:
 6. Do NOT paraphrase code - quote it exactly
 
 OUTPUT SCHEMA:
-{{
+{
     "sections": [
-        {{
+        {
             "text": "The UserController handles user authentication by calling the AuthService.",
             "source_ids": [1, 3],
             "quoted_spans": [
-                {{"source_id": 1, "quote": "class UserController"}},
-                {{"source_id": 3, "quote": "$this->authService->authenticate($credentials)"}}
+                {"source_id": 1, "quote": "class UserController"},
+                {"source_id": 3, "quote": "$this->authService->authenticate($credentials)"}
             ]
-        }}
+        }
     ],
     "unknowns": [
         "I could not find where password reset emails are sent"
     ]
-}}
+}
 
 IMPORTANT: Each quoted_span.quote must be a verbatim substring that appears in the corresponding source. I will verify these quotes exist.
 
-SOURCES:
-{{sources}}
+QUESTION: """
+    _PROMPT_MID = "\n\nSOURCES:\n"
+    _PROMPT_SUFFIX = "\n\nRespond with ONLY the JSON object, no other text:"
+
+    # Most recent answers per repo/commit compared against a new question
+    ANSWER_CACHE_CANDIDATES = 200
 
-QUESTION: {{question}}
+    # Concurrent GitHub file fetches per question, to respect rate limits
+    SNIPPET_FETCH_CONCURRENCY = 8
 
-Respond with ONLY the JSON object, no other text:"""
+    # Reciprocal rank fusion constant; dampens the weight of top ranks
+    RRF_K = 60
+
+    # Bound on the first answer generation, including the LLM client's own retries
+    ANSWER_TIMEOUT_SECONDS = 60.0
+
+    # The JSON-mode retry after an unparseable answer is shorter and bounded
+    ANSWER_RETRY_MAX_TOKENS = 800
+    ANSWER_RETRY_TIMEOUT_SECONDS = 20.0
 
     def __init__(
         self,
@@ -132,7 +323,6 @@ Respond with ONLY the JSON object, no other text:"""
         self.embedding_service = embedding_service
         self.llm_service = llm_service
         self.github_service = github_service
-        from app.services.claim_validator import ClaimValidator
         self.claim_validator = ClaimValidator()
 
     async def answer_question(
@@ -151,6 +341,25 @@ Respond with ONLY the JSON object, no other text:"""
         Returns:
             QAResult with answer and citations
         """
+        # Step 0: Reuse an earlier answer to the same question, matched exactly
+        # after normalization and then semantically
+        settings = get_settings()
+        repo = None
+        question_hash = _question_hash(question)
+        question_embedding = None
+        if settings.qa_answer_cache_enabled:
+            repo = await self._get_repo(repo_id)
+            cached = await self._find_exact_answer(repo, question_hash)
+            if cached:
+                return cached
+
+            question_embedding = await self.embedding_service.embed_query(question)
+            cached = await self._find_cached_answer(
+                repo, question_embedding, settings.qa_answer_cache_threshold
+            )
+            if cached:
+                return cached
+
         # Step 1: Retrieve sources
         sources = await self._retrieve_sources(repo_id, question)
 
@@ -159,7 +368,8 @@ Respond with ONLY the JSON object, no other text:"""
             return self._no_evidence_result(question)
 
         # Step 3: Fetch actual snippets from GitHub
-        repo = await self._get_repo(repo_id)
+        if repo is None:
+            repo = await self._get_repo(repo_id)
         sources = await self._fetch_snippets(repo, sources)
 
         # Step 4: Generate answer with structured output
@@ -168,11 +378,23 @@ Respond with ONLY the JSON object, no other text:"""
         # Step 5: Build citations
         citations = self._build_citations(sources, validated, repo)
 
-        # Step 6: Store answer
-        await self._store_answer(repo_id, user_id, question, validated, citations, usage)
+        # Step 6: Store answer; the stored and returned text are the same string
+        answer_text = self._format_answer_text(validated)
+        await self._store_answer(
+            repo_id,
+            user_id,
+            question,
+            validated,
+            answer_text,
+            citations,
+            usage,
+            commit_sha=repo.last_indexed_commit,
+            question_hash=question_hash,
+            question_embedding=question_embedding,
+        )
 
         return QAResult(
-            answer_text=self._format_answer_text(validated),
+            answer_text=answer_text,
             citations=citations,
             confidence_tier=validated.confidence_tier,
             unknowns=validated.unknowns,
@@ -185,29 +407,8 @@ Respond with ONLY the JSON object, no other text:"""
         question: str,
     ) -> list[RetrievedSource]:
         """Retrieve sources using hybrid search."""
-        sources = []
-        seen_keys = set()
-        index = 0
-
-        # Trigram search on symbols
-        trigram_results = await self._trigram_search(repo_id, question)
-        for r in trigram_results:
-            key = f"{r['file_path']}:{r['start_line']}"
-            if key not in seen_keys:
-                seen_keys.add(key)
-                index += 1
-                sources.append(
-                    RetrievedSource(
-                        index=index,
-                        file_path=r["file_path"],
-                        start_line=r["start_line"],
-                        end_line=r["end_line"],
-                        content="",  # Fetched later from GitHub
-                        symbol_name=r.get("symbol_name"),
-                        score=r["score"],
-                        source_type="trigram",
-                    )
-                )
+        searches = [self._trigram_search(repo_id, question)]
+        source_types = ["trigram"]
 
         # Vector search (requires LLM service in embedding service)
         if self.llm_service:
@@ -215,37 +416,50 @@ Respond with ONLY the JSON object, no other text:"""
             if not self.embedding_service.llm_service:
                 self.embedding_service.llm_service = self.llm_service
 
-            vector_results = await self.embedding_service.search_repo(
-                repo_id,
-                question,
-                limit=15,
-            )
-            for r in vector_results:
-                key = f"{r['file_path']}:{r['start_line']}"
-                if key not in seen_keys:
-                    seen_keys.add(key)
-                    index += 1
-                    sources.append(
-                        RetrievedSource(
-                            index=index,
-                            file_path=r["file_path"],
-                            start_line=r["start_line"],
-                            end_line=r["end_line"],
-                            content="",
-                            symbol_name=r.get("symbol_name"),
-                            score=r["score"],
-                            source_type="vector",
-                        )
+            searches.append(self.embedding_service.search_repo(repo_id, question, limit=15))
+            source_types.append("vector")
+
+        # Trigram (database) and vector (embedding API) searches overlap; a
+        # failing search is logged and contributes no sources
+        results = await asyncio.gather(*searches, return_exceptions=True)
+        for i, search_results in enumerate(results):
+            if isinstance(search_results, BaseException):
+                logger.warning(f"{source_types[i].capitalize()} search failed: {search_results}")
+                results[i] = []
+
+        # Fuse the ranked lists with reciprocal rank fusion: trigram similarity
+        # and cosine scores are on different scales, ranks are comparable.
+        # RetrievedSource.score keeps the raw score for confidence scoring.
+        sources = {}
+        fused_scores = defaultdict(float)
+        for source_type, search_results in zip(source_types, results):
+            ranked = set()
+            for r in search_results:
+                key = (r["file_path"], r["start_line"])
+                if key in ranked:
+                    continue
+                ranked.add(key)
+                fused_scores[key] += 1.0 / (self.RRF_K + len(ranked))
+                if key not in sources:
+                    sources[key] = RetrievedSource(
+                        index=0,  # Numbered once the top 15 are chosen
+                        file_path=r["file_path"],
+                        start_line=r["start_line"],
+                        end_line=r["end_line"],
+                        content="",  # Fetched later from GitHub
+                        symbol_name=r.get("symbol_name"),
+                        score=r["score"],
+                        source_type=source_type,
                     )
 
-        # Sort by score and limit
-        sources.sort(key=lambda x: x.score, reverse=True)
+        # Keep the 15 best by fused score (ties keep merge order, as a stable sort would)
+        top_keys = heapq.nlargest(15, sources, key=fused_scores.__getitem__)
+        top = [sources[key] for key in top_keys]
 
-        # Re-index after sorting
-        for i, source in enumerate(sources[:15], 1):
+        for i, source in enumerate(top, 1):
             source.index = i
 
-        return sources[:15]
+        return top
 
     async def _trigram_search(
         self,
@@ -253,14 +467,13 @@ Respond with ONLY the JSON object, no other text:"""
         query: str,
     ) -> list[dict[str, Any]]:
         """Search using trigram similarity."""
-        from app.models.symbol import Symbol
-
         # Extract keywords from query
         keywords = self._extract_keywords(query)
         if not keywords:
             return []
 
-        # Build trigram query
+        # Build trigram query. The full-text predicate must match the
+        # idx_symbols_search expression exactly for the GIN index to be used.
         sql = text("""
             SELECT 
                 s.name,
@@ -271,14 +484,16 @@ Respond with ONLY the JSON object, no other text:"""
                 s.signature,
                 GREATEST(
                     similarity(s.name, :query),
-                    similarity(s.qualified_name, :query)
+                    similarity(s.qualified_name, :query),
+                    word_similarity(:query, COALESCE(s.search_text, ''))
                 ) as score
             FROM symbols s
             WHERE s.repo_id = :repo_id
             AND (
                 s.name % :query
                 OR s.qualified_name % :query
-                OR s.search_text ILIKE :like_query
+                OR to_tsvector('simple', COALESCE(s.search_text, ''))
+                    @@ websearch_to_tsquery('simple', :text_query)
             )
             ORDER BY score DESC
             LIMIT 10
@@ -289,7 +504,8 @@ Respond with ONLY the JSON object, no other text:"""
             {
                 "repo_id": repo_id,
                 "query": " ".join(keywords),
-                "like_query": f"%{keywords[0]}%" if keywords else "%",
+                # Any keyword may match: "a or b" parses to 'a' | 'b'
+                "text_query": " or ".join(keywords),
             },
         )
 
@@ -315,90 +531,7 @@ Respond with ONLY the JSON object, no other text:"""
         - Special symbols (__init__, ::, /)
         - File paths (app/Http/Controllers)
         """
-        stopwords = {
-            "the", "a", "an", "is", "are", "was", "were", "be", "been",
-            "how", "what", "where", "when", "why", "which", "who",
-            "does", "do", "did", "has", "have", "had",
-            "in", "on", "at", "to", "for", "of", "with", "by",
-            "can", "could", "would", "should", "will",
-            "this", "that", "these", "those", "it", "its",
-            "and", "or", "but", "if", "then", "else",
-            "my", "your", "our", "their", "i", "you", "we", "they",
-        }
-
-        keywords = []
-        seen = set()
-
-        def add_keyword(kw: str) -> None:
-            """Add keyword if valid and not seen."""
-            if kw and kw.lower() not in stopwords and kw not in seen:
-                # Keep ALLCAPS as-is, otherwise lowercase for matching
-                seen.add(kw)
-                keywords.append(kw)
-
-        # Extract file paths (e.g., app/Http/Controllers/UserController.php)
-        file_paths = re.findall(r'[\w./\\-]+\.(?:php|py|js|ts|tsx|jsx|java|go|rs|rb)', query)
-        for path in file_paths:
-            add_keyword(path)
-            # Also extract the filename without extension
-            filename = path.split('/')[-1].split('\\')[-1].rsplit('.', 1)[0]
-            add_keyword(filename)
-
-        # Extract qualified names (e.g., AuthService::login, App\Models\User)
-        qualified = re.findall(r'\b[\w]+(?:(?:::|\.|\\)[\w]+)+\b', query)
-        for q in qualified:
-            add_keyword(q)
-            # Also extract individual parts
-            parts = re.split(r'::|\\|\.', q)
-            for part in parts:
-                if len(part) > 1:
-                    add_keyword(part)
-
-        # Extract special Python/Ruby dunders (__init__, __call__, etc.)
-        dunders = re.findall(r'__\w+__', query)
-        for d in dunders:
-            add_keyword(d)
-
-        # Extract tokens with digits (OAuth2, S3, v2, etc.) - preserve as-is
-        alphanumeric = re.findall(r'\b[A-Za-z]+\d+\w*\b|\b\d+[A-Za-z]+\w*\b', query)
-        for an in alphanumeric:
-            add_keyword(an)
-
-        # Extract ALLCAPS tokens (API, JWT, HTTP, etc.)
-        allcaps = re.findall(r'\b[A-Z]{2,}\b', query)
-        for ac in allcaps:
-            add_keyword(ac)
-
-        # Extract camelCase and PascalCase - keep original AND split parts
-        camel_pattern = re.findall(r'\b[a-z]+(?:[A-Z][a-z]+)+\b|\b[A-Z][a-z]+(?:[A-Z][a-z]+)+\b', query)
-        for camel in camel_pattern:
-            add_keyword(camel)
-            # Split camelCase into parts
-            parts = re.findall(r'[A-Z]?[a-z]+|[A-Z]+(?=[A-Z][a-z]|\d|\W|$)', camel)
-            for part in parts:
-                if len(part) > 2:
-                    add_keyword(part)
-
-        # Extract snake_case - keep original AND split parts
-        snake_pattern = re.findall(r'\b\w+(?:_\w+)+\b', query)
-        for snake in snake_pattern:
-            add_keyword(snake)
-            parts = snake.split('_')
-            for part in parts:
-                if len(part) > 2:
-                    add_keyword(part)
-
-        # Extract remaining meaningful words (not already captured)
-        remaining = re.findall(r'\b[A-Za-z][A-Za-z0-9]*\b', query)
-        for word in remaining:
-            if len(word) > 2:
-                add_keyword(word)
-
-        # Prioritize: keep all keywords but limit total for query efficiency
-        # Sort by length (longer = more specific) then alphabetically
-        keywords.sort(key=lambda k: (-len(k), k.lower()))
-
-        return keywords[:10]  # Allow more keywords for better recall
+        return list(_extract_keywords(query))
 
     async def _fetch_snippets(
         self,
@@ -409,55 +542,64 @@ Respond with ONLY the JSON object, no other text:"""
         if not repo.last_indexed_commit:
             return sources
 
+        # Check cache first, for every source in one query
+        cached = await self._get_cached_snippets(repo.id, repo.last_indexed_commit, sources)
+        missing = []
         for source in sources:
-            # Check cache first
-            cached = await self._get_cached_snippet(
-                repo.id,
-                repo.last_indexed_commit,
-                source.file_path,
-                source.start_line,
-                source.end_line,
-            )
+            content = cached.get((source.file_path, source.start_line, source.end_line))
+            if content:
+                source.content = content
+            else:
+                missing.append(source)
 
-            if cached:
-                source.content = cached
-                continue
+        if not missing:
+            return sources
 
-            # Fetch from GitHub
-            try:
-                content = await self.github_service.get_file_content(
+        # Fetch each file once, concurrently; sources often share a file
+        paths = list(dict.fromkeys(source.file_path for source in missing))
+        semaphore = asyncio.Semaphore(self.SNIPPET_FETCH_CONCURRENCY)
+
+        async def fetch_file(path: str) -> str:
+            async with semaphore:
+                return await self.github_service.get_file_content(
                     installation_id=repo.github_installation_id,
                     owner=repo.owner,
                     repo=repo.name,
-                    path=source.file_path,
+                    path=path,
                     ref=repo.last_indexed_commit,
                 )
 
-                # Extract lines
-                lines = content.split("\n")
-                start_idx = max(0, source.start_line - 1)
-                end_idx = min(len(lines), source.end_line)
-                snippet = "\n".join(lines[start_idx:end_idx])
-
-                # Limit size
-                if len(snippet) > 500:
-                    snippet = snippet[:500] + "..."
-
-                source.content = snippet
-
-                # Cache it
-                await self._cache_snippet(
-                    repo.id,
-                    repo.last_indexed_commit,
-                    source.file_path,
-                    source.start_line,
-                    source.end_line,
-                    snippet,
-                )
+        fetched = await asyncio.gather(
+            *(fetch_file(path) for path in paths), return_exceptions=True
+        )
+        files = dict(zip(paths, fetched))
+
+        snippets: dict[tuple[str, int, int], str] = {}
+        for source in missing:
+            content = files[source.file_path]
+            if isinstance(content, BaseException):
+                logger.warning(f"Failed to fetch snippet: {content}")
+                source.content = f"[Could not fetch: {str(content)}]"
+                continue
+
+            # Extract lines
+            snippet = _slice_lines(content, source.start_line, source.end_line)
+
+            # Limit size
+            if len(snippet) > 500:
+                snippet = snippet[:500] + "..."
+
+            source.content = snippet
+            snippets[(source.file_path, source.start_line, source.end_line)] = snippet
 
+        # Cache them, in one statement. The savepoint keeps a failed cache
+        # write from aborting the transaction the answer is stored in.
+        if snippets:
+            try:
+                async with self.db.begin_nested():
+                    await self._cache_snippets(repo.id, repo.last_indexed_commit, snippets)
             except Exception as e:
-                logger.warning(f"Failed to fetch snippet: {e}")
-                source.content = f"[Could not fetch: {str(e)}]"
+                logger.warning(f"Failed to cache snippets: {e}")
 
         return sources
 
@@ -472,35 +614,67 @@ Respond with ONLY the JSON object, no other text:"""
             Tuple of (ValidatedAnswer, usage_dict)
         """
         # Build sources text
-        sources_text = "\n\n".join(
-            [
-                f"[Source {s.index}] {s.file_path}:{s.start_line}-{s.end_line}"
-                f"{f' ({s.symbol_name})' if s.symbol_name else ''}\n"
-                f"```\n{s.content}\n```"
-                for s in sources
-            ]
+        parts = []
+        for s in sources:
+            header = f"[Source {s.index}] {s.file_path}:{s.start_line}-{s.end_line}"
+            if s.symbol_name:
+                header = f"{header} ({s.symbol_name})"
+            parts.append(f"{header}\n```\n{s.content}\n```")
+        sources_text = "\n\n".join(parts)
+
+        prompt = (
+            f"{self._PROMPT_PREFIX}{question}"
+            f"{self._PROMPT_MID}{sources_text}{self._PROMPT_SUFFIX}"
         )
 
-        prompt = self.ANSWER_PROMPT.format(sources=sources_text, question=question)
-
-        # Generate with usage tracking
-        response, usage = await self.llm_service.generate_with_usage(prompt, max_tokens=1500)
-
-        # Parse JSON
-        parsed = self._parse_answer_json(response)
-        if not parsed:
-            # Retry once
-            response, retry_usage = await self.llm_service.generate_with_usage(
-                prompt + "\n\nRemember: Output ONLY valid JSON.",
-                max_tokens=1500,
+        # Generate with usage tracking, bounded so the LLM client's retries
+        # cannot stretch the request indefinitely
+        timed_out = False
+        try:
+            response, usage = await asyncio.wait_for(
+                self.llm_service.generate_with_usage(prompt, max_tokens=1500),
+                timeout=self.ANSWER_TIMEOUT_SECONDS,
             )
-            usage = retry_usage
-            parsed = self._parse_answer_json(response)
+        except TimeoutError:
+            # The provider may still bill the abandoned call, but its token
+            # counts never arrive; the answer is flagged so its missing
+            # input/output tokens read as unknown rather than zero
+            logger.warning(
+                f"Answer generation timed out after {self.ANSWER_TIMEOUT_SECONDS}s; "
+                "token usage of the abandoned call is unknown"
+            )
+            response, usage, timed_out = None, {}, True
+
+        # Parse JSON; a timed-out generation goes straight to evidence-only
+        parsed = self._parse_answer_json(response) if response is not None else None
+        if not parsed and response is not None:
+            # Retry once in JSON mode, bounded so a slow provider cannot
+            # double the request's worst-case latency
+            try:
+                response, retry_usage = await asyncio.wait_for(
+                    self.llm_service.generate_with_usage(
+                        prompt + "\n\nRemember: Output ONLY valid JSON.",
+                        max_tokens=self.ANSWER_RETRY_MAX_TOKENS,
+                        json_mode=True,
+                    ),
+                    timeout=self.ANSWER_RETRY_TIMEOUT_SECONDS,
+                )
+            except TimeoutError:
+                logger.warning(
+                    f"Answer retry timed out after {self.ANSWER_RETRY_TIMEOUT_SECONDS}s; "
+                    "token usage of the abandoned call is unknown"
+                )
+            else:
+                usage = retry_usage
+                parsed = self._parse_answer_json(response)
 
         if not parsed:
             # Return degraded evidence-only response instead of "nothing"
             # This allows users to still see retrieved sources
             logger.warning("JSON parsing failed, returning evidence-only response")
+            confidence_factors = {"degraded_mode": True, "parse_failed": True}
+            if timed_out:
+                confidence_factors["generation_timed_out"] = True
             return (
                 ValidatedAnswer(
                     sections=[
@@ -518,7 +692,7 @@ Respond with ONLY the JSON object, no other text:"""
                         "Please review the citations manually",
                     ],
                     confidence_tier=ConfidenceTier.NONE,
-                    confidence_factors={"degraded_mode": True, "parse_failed": True},
+                    confidence_factors=confidence_factors,
                     validation_passed=False,
                     validation_errors=["JSON parsing failed - evidence-only mode"],
                 ),
@@ -530,7 +704,39 @@ Respond with ONLY the JSON object, no other text:"""
         return validated, usage
 
     def _parse_answer_json(self, response: str) -> dict[str, Any] | None:
-        """Parse JSON from LLM response with multiple repair strategies.
+        """Parse the LLM response into an answer dict, or None.
+
+        Decoded JSON that does not have the answer schema's shape counts as
+        a parse failure, so the caller retries instead of _validate_answer
+        failing on it.
+        """
+        parsed = self._decode_answer_json(response)
+        if parsed is None:
+            return None
+        if not self._has_answer_shape(parsed):
+            logger.warning("LLM response JSON does not match the answer schema")
+            return None
+        return parsed
+
+    def _has_answer_shape(self, parsed: Any) -> bool:
+        """Check the container types _validate_answer relies on."""
+        if not isinstance(parsed, dict):
+            return False
+        sections = parsed.get("sections", [])
+        if not isinstance(sections, list) or not isinstance(parsed.get("unknowns", []), list):
+            return False
+        for section in sections:
+            if not isinstance(section, dict):
+                return False
+            if not isinstance(section.get("source_ids", []), list):
+                return False
+            quotes = section.get("quoted_spans", [])
+            if not isinstance(quotes, list) or not all(isinstance(q, dict) for q in quotes):
+                return False
+        return True
+
+    def _decode_answer_json(self, response: str) -> Any:
+        """Decode JSON from LLM response with multiple repair strategies.
 
         Handles:
         - Direct JSON
@@ -541,26 +747,27 @@ Respond with ONLY the JSON object, no other text:"""
         """
         # Strategy 1: Direct parse
         try:
-            return json.loads(response)
+            return _json_loads(response)
         except json.JSONDecodeError:
             pass
 
         # Strategy 2: Extract from markdown code block
-        code_block_match = re.search(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', response)
+        code_block_match = _JSON_CODE_BLOCK_RE.search(response)
         if code_block_match:
             try:
-                return json.loads(code_block_match.group(1))
+                return _json_loads(code_block_match.group(1))
             except json.JSONDecodeError:
                 pass
 
-        # Strategy 3: Find JSON object in response (greedy)
-        json_match = re.search(r'\{[\s\S]*\}', response)
-        if json_match:
-            json_str = json_match.group()
+        # Strategy 3: Take everything from the first "{" to the last "}"
+        start_idx = response.find('{')
+        end_idx = response.rfind('}')
+        if 0 <= start_idx < end_idx:
+            json_str = response[start_idx:end_idx + 1]
 
             # Try direct parse
             try:
-                return json.loads(json_str)
+                return _json_loads(json_str)
             except json.JSONDecodeError:
                 pass
 
@@ -568,53 +775,74 @@ Respond with ONLY the JSON object, no other text:"""
             repaired = self._repair_json(json_str)
             if repaired:
                 try:
-                    return json.loads(repaired)
+                    return _json_loads(repaired)
                 except json.JSONDecodeError:
                     pass
 
-        # Strategy 5: Try to find last complete JSON object (for truncated responses)
-        # Look for balanced braces
-        brace_count = 0
-        last_complete_end = -1
-        start_idx = response.find('{')
-
-        if start_idx >= 0:
-            for i, char in enumerate(response[start_idx:], start_idx):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        last_complete_end = i + 1
-                        break
-
-            if last_complete_end > start_idx:
-                try:
-                    return json.loads(response[start_idx:last_complete_end])
-                except json.JSONDecodeError:
-                    repaired = self._repair_json(response[start_idx:last_complete_end])
-                    if repaired:
-                        try:
-                            return json.loads(repaired)
-                        except json.JSONDecodeError:
-                            pass
+        # Strategy 5: Take the first balanced JSON object (trailing text or
+        # a second object after it)
+        json_str = self._extract_json_object(response)
+        if json_str:
+            try:
+                return _json_loads(json_str)
+            except json.JSONDecodeError:
+                repaired = self._repair_json(json_str)
+                if repaired:
+                    try:
+                        return _json_loads(repaired)
+                    except json.JSONDecodeError:
+                        pass
+
+        # Strategy 6: General-purpose local repair (truncation, unbalanced
+        # quotes), before the caller spends a second LLM call
+        if repair_json is not None:
+            repaired = repair_json(response, return_objects=True)
+            if self._has_answer_shape(repaired) and any(
+                section.get("text") and section.get("source_ids")
+                for section in repaired.get("sections", [])
+            ):
+                return repaired
 
         logger.warning("All JSON parsing strategies failed")
         return None
 
-    def _repair_json(self, json_str: str) -> str | None:
-        """Attempt to repair common JSON issues."""
-        try:
-            repaired = json_str
+    def _extract_json_object(self, text: str) -> str | None:
+        """Return the first complete {...} object in text, or None.
 
-            # Remove trailing commas before ] or }
-            repaired = re.sub(r',\s*([\]}])', r'\1', repaired)
+        Scans linearly, jumping between structural characters and ignoring
+        braces inside string literals (quoted code often contains them).
+        """
+        start = text.find('{')
+        if start < 0:
+            return None
 
-            # Fix unquoted keys (simple cases)
-            repaired = re.sub(r'(\{|,)\s*(\w+)\s*:', r'\1"\2":', repaired)
+        depth = 0
+        in_string = False
+        pos = start
+        while match := _JSON_STRUCTURE_RE.search(text, pos):
+            char = match.group()
+            pos = match.end()
+            if in_string:
+                if char == '\\':
+                    pos += 1  # skip the escaped character
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return text[start:pos]
+        return None
 
-            # Remove control characters
-            repaired = re.sub(r'[\x00-\x1f]', '', repaired)
+    def _repair_json(self, json_str: str) -> str | None:
+        """Attempt to repair common JSON issues."""
+        try:
+            # Drop trailing commas and control characters, quote simple
+            # unquoted keys
+            repaired = _JSON_REPAIR_RE.sub(_repair_match, json_str)
 
             # Fix single quotes to double quotes (risky but sometimes needed)
             # Only if no double quotes present in values
@@ -632,7 +860,6 @@ Respond with ONLY the JSON object, no other text:"""
     ) -> ValidatedAnswer:
         """Validate the parsed answer with claim-to-evidence verification."""
         errors = []
-        valid_source_ids = {s.index for s in sources}
         source_by_id = {s.index: s for s in sources}
 
         sections = []
@@ -652,11 +879,13 @@ Respond with ONLY the JSON object, no other text:"""
                 errors.append(f"Section {i} has no source_ids")
                 continue
 
-            # Validate source_ids exist
-            invalid_ids = [sid for sid in source_ids if sid not in valid_source_ids]
+            # Validate source_ids exist, partitioning them in one pass
+            valid_ids, invalid_ids = [], []
+            for sid in source_ids:
+                (valid_ids if sid in source_by_id else invalid_ids).append(sid)
             if invalid_ids:
                 errors.append(f"Section {i} references invalid source_ids: {invalid_ids}")
-                source_ids = [sid for sid in source_ids if sid in valid_source_ids]
+            source_ids = valid_ids
 
             if not source_ids:
                 continue
@@ -915,12 +1144,6 @@ Respond with ONLY the JSON object, no other text:"""
         citations = []
         for source in sources:
             if source.index in cited_ids:
-                github_url = (
-                    f"https://github.com/{repo.full_name}/blob/"
-                    f"{repo.last_indexed_commit}/{source.file_path}"
-                    f"#L{source.start_line}-L{source.end_line}"
-                )
-
                 citations.append(
                     {
                         "source_index": source.index,
@@ -929,12 +1152,22 @@ Respond with ONLY the JSON object, no other text:"""
                         "end_line": source.end_line,
                         "snippet": source.content,
                         "symbol_name": source.symbol_name,
-                        "github_url": github_url,
+                        "github_url": self._github_url(
+                            repo, source.file_path, source.start_line, source.end_line
+                        ),
                     }
                 )
 
         return citations
 
+    def _github_url(self, repo: Repository, file_path: str, start_line: int, end_line: int) -> str:
+        """Link to a line range at the repository's indexed commit."""
+        return (
+            f"https://github.com/{repo.full_name}/blob/"
+            f"{repo.last_indexed_commit}/{file_path}"
+            f"#L{start_line}-L{end_line}"
+        )
+
     def _no_evidence_result(self, question: str) -> QAResult:
         """Return result when no evidence found."""
         return QAResult(
@@ -948,56 +1181,182 @@ Respond with ONLY the JSON object, no other text:"""
             has_sufficient_evidence=False,
         )
 
+    async def _find_cached_answer(
+        self,
+        repo: Repository,
+        question_embedding: list[float] | None,
+        threshold: float,
+    ) -> QAResult | None:
+        """Return a stored answer whose question embeds within threshold of this one.
+
+        Only answers for the repository's current indexed commit that had
+        some evidence are candidates; similarity is cosine, computed over the
+        most recent candidates in one matrix product.
+        """
+        if not question_embedding or not repo.last_indexed_commit:
+            return None
+
+        result = await self.db.execute(
+            select(
+                Answer.id,
+                Answer.question_embedding,
+                Answer.answer_text,
+                Answer.unknowns,
+                Answer.confidence_tier,
+            )
+            .where(
+                Answer.repo_id == repo.id,
+                Answer.commit_sha == repo.last_indexed_commit,
+                Answer.question_embedding.is_not(None),
+                Answer.confidence_tier != ConfidenceTier.NONE.value,
+            )
+            .order_by(Answer.created_at.desc())
+            .limit(self.ANSWER_CACHE_CANDIDATES)
+        )
+        # Embeddings from a different model can have another dimension
+        rows = [r for r in result.all() if len(r.question_embedding) == len(question_embedding)]
+        if not rows:
+            return None
+
+        matrix = np.array([r.question_embedding for r in rows], dtype=float)
+        query = np.array(question_embedding, dtype=float)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarities = (matrix @ query) / np.where(norms > 0, norms, 1.0)
+        best = int(np.argmax(similarities))
+        if similarities[best] < threshold:
+            return None
+
+        match = rows[best]
+        logger.info(
+            f"Semantic answer cache hit for repo {repo.id} "
+            f"(similarity {similarities[best]:.3f})"
+        )
+        return await self._cached_result(repo, match)
+
+    async def _find_exact_answer(self, repo: Repository, question_hash: str) -> QAResult | None:
+        """Return the latest stored answer to this exact (normalized) question.
+
+        Fails closed: only answers for the repository's current indexed
+        commit with some evidence are reused.
+        """
+        if not repo.last_indexed_commit:
+            return None
+
+        result = await self.db.execute(
+            select(
+                Answer.id,
+                Answer.answer_text,
+                Answer.unknowns,
+                Answer.confidence_tier,
+            )
+            .where(
+                Answer.repo_id == repo.id,
+                Answer.commit_sha == repo.last_indexed_commit,
+                Answer.question_hash == question_hash,
+                Answer.confidence_tier != ConfidenceTier.NONE.value,
+            )
+            .order_by(Answer.created_at.desc())
+            .limit(1)
+        )
+        match = result.first()
+        if match is None:
+            return None
+
+        logger.info(f"Exact answer cache hit for repo {repo.id}")
+        return await self._cached_result(repo, match)
+
+    async def _cached_result(self, repo: Repository, match: Any) -> QAResult:
+        """Build a QAResult from a stored answer row and its citations."""
+        cited = await self.db.execute(
+            select(Citation).where(Citation.answer_id == match.id).order_by(Citation.source_index)
+        )
+        citations = [
+            {
+                "source_index": c.source_index,
+                "file_path": c.file_path,
+                "start_line": c.start_line,
+                "end_line": c.end_line,
+                "snippet": c.snippet,
+                "symbol_name": c.symbol_name,
+                "github_url": self._github_url(repo, c.file_path, c.start_line, c.end_line),
+            }
+            for c in cited.scalars()
+        ]
+        return QAResult(
+            answer_text=match.answer_text or "",
+            citations=citations,
+            confidence_tier=ConfidenceTier(match.confidence_tier),
+            unknowns=match.unknowns or [],
+            has_sufficient_evidence=True,
+        )
+
     async def _get_repo(self, repo_id: str) -> Repository:
-        """Get repository record."""
-        result = await self.db.execute(select(Repository).where(Repository.id == repo_id))
-        return result.scalar_one()
+        """Get repository record.
 
-    async def _get_cached_snippet(
+        Goes through the session identity map, so a repository the route
+        already loaded in this session is returned without another query.
+        """
+        return await self.db.get_one(Repository, uuid.UUID(str(repo_id)))
+
+    async def _get_cached_snippets(
         self,
         repo_id: str,
         commit_sha: str,
-        file_path: str,
-        start_line: int,
-        end_line: int,
-    ) -> str | None:
-        """Get cached snippet if available."""
+        sources: list[RetrievedSource],
+    ) -> dict[tuple[str, int, int], str]:
+        """Get unexpired cached snippets, keyed by (file_path, start_line, end_line)."""
+        locations = {(s.file_path, s.start_line, s.end_line) for s in sources}
+        if not locations:
+            return {}
+
         result = await self.db.execute(
-            select(SnippetCache).where(
+            select(
+                SnippetCache.file_path,
+                SnippetCache.start_line,
+                SnippetCache.end_line,
+                SnippetCache.content,
+            ).where(
                 SnippetCache.repo_id == repo_id,
                 SnippetCache.commit_sha == commit_sha,
-                SnippetCache.file_path == file_path,
-                SnippetCache.start_line == start_line,
-                SnippetCache.end_line == end_line,
-                SnippetCache.expires_at > text("NOW()"),
+                tuple_(
+                    SnippetCache.file_path, SnippetCache.start_line, SnippetCache.end_line
+                ).in_(list(locations)),
+                SnippetCache.expires_at > datetime.utcnow(),
             )
         )
-        cache = result.scalar_one_or_none()
-        return cache.content if cache else None
+        return {(r.file_path, r.start_line, r.end_line): r.content for r in result}
 
-    async def _cache_snippet(
+    async def _cache_snippets(
         self,
         repo_id: str,
         commit_sha: str,
-        file_path: str,
-        start_line: int,
-        end_line: int,
-        content: str,
+        snippets: dict[tuple[str, int, int], str],
     ) -> None:
-        """Cache snippet for later use."""
-        from datetime import datetime, timedelta
-
-        cache = SnippetCache(
-            repo_id=repo_id,
-            commit_sha=commit_sha,
-            file_path=file_path,
-            start_line=start_line,
-            end_line=end_line,
-            content=content,
-            expires_at=datetime.utcnow() + timedelta(hours=1),
+        """Cache snippets for later use, keyed by (file_path, start_line, end_line)."""
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        rows = [
+            {
+                "repo_id": repo_id,
+                "commit_sha": commit_sha,
+                "file_path": file_path,
+                "start_line": start_line,
+                "end_line": end_line,
+                "content": content,
+                "expires_at": expires_at,
+            }
+            for (file_path, start_line, end_line), content in snippets.items()
+        ]
+        # The location may hold an expired row or one a concurrent request
+        # just cached; either way refresh it with what was fetched here
+        stmt = pg_insert(SnippetCache)
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["repo_id", "commit_sha", "file_path", "start_line", "end_line"],
+                set_={"content": stmt.excluded.content, "expires_at": stmt.excluded.expires_at},
+            ),
+            rows,
         )
-        self.db.add(cache)
-        await self.db.commit()
+        # Committed together with the answer in _store_answer
 
     async def _store_answer(
         self,
@@ -1005,8 +1364,12 @@ Respond with ONLY the JSON object, no other text:"""
         user_id: str,
         question: str,
         validated: ValidatedAnswer,
+        answer_text: str,
         citations: list[dict[str, Any]],
         usage: dict[str, int],
+        commit_sha: str | None = None,
+        question_hash: str | None = None,
+        question_embedding: list[float] | None = None,
     ) -> None:
         """Store answer in database with full evidence chain."""
         # Serialize sections with quoted spans
@@ -1030,7 +1393,10 @@ Respond with ONLY the JSON object, no other text:"""
             repo_id=repo_id,
             user_id=user_id,
             question=question,
-            answer_text=self._format_answer_text(validated),
+            commit_sha=commit_sha,
+            question_hash=question_hash,
+            question_embedding=question_embedding,
+            answer_text=answer_text,
             answer_sections=serialized_sections,
             unknowns=validated.unknowns,
             confidence_tier=validated.confidence_tier.value,
@@ -1044,16 +1410,21 @@ Respond with ONLY the JSON object, no other text:"""
         self.db.add(answer)
         await self.db.flush()
 
-        for cite in citations:
-            citation = Citation(
-                answer_id=answer.id,
-                source_index=cite["source_index"],
-                file_path=cite["file_path"],
-                start_line=cite["start_line"],
-                end_line=cite["end_line"],
-                snippet=cite["snippet"][:500],
-                symbol_name=cite.get("symbol_name"),
+        if citations:
+            await self.db.execute(
+                insert(Citation),
+                [
+                    {
+                        "answer_id": answer.id,
+                        "source_index": cite["source_index"],
+                        "file_path": cite["file_path"],
+                        "start_line": cite["start_line"],
+                        "end_line": cite["end_line"],
+                        "snippet": cite["snippet"][:500],
+                        "symbol_name": cite.get("symbol_name"),
+                    }
+                    for cite in citations
+                ],
             )
-            self.db.add(citation)
 
         await self.db.commit()
@@ -1,11 +1,14 @@
 """PR review service using high-precision analyzers only."""
 
+import asyncio
 import logging
 import re
+import uuid
 from datetime import datetime
+from itertools import chain
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.pr_finding import PRFinding
@@ -16,10 +19,16 @@ from app.services.llm_service import LLMService
 
 logger = logging.getLogger(__name__)
 
+# New-file start line in a hunk header: @@ -start,count +start,count @@
+_HUNK_START_RE = re.compile(r"\+(\d+)")
+
 
 class ReviewService:
     """PR review service using high-precision analyzers only."""
 
+    # Max concurrent GitHub file fetches while analyzing a PR
+    FILE_FETCH_CONCURRENCY = 8
+
     def __init__(self, db: AsyncSession, github_service: GitHubService, llm_service: LLMService):
         self.db = db
         self.github_service = github_service
@@ -51,18 +60,19 @@ class ReviewService:
             self.Finding = Finding
             self.Severity = Severity
 
-        # Get repo
-        result = await self.db.execute(select(Repository).where(Repository.id == repo_id))
-        repo = result.scalar_one()
+        # Get repo; the route has usually loaded it into this session already,
+        # in which case the identity map answers without a query
+        repo = await self.db.get_one(Repository, uuid.UUID(str(repo_id)))
 
-        # Create review record
+        # Create review record. The id is assigned here so the row can stay
+        # pending until something needs it in the database.
         review = PRReview(
+            id=uuid.uuid4(),
             repo_id=repo_id,
             pr_number=pr_number,
             status="analyzing",
         )
         self.db.add(review)
-        await self.db.flush()
 
         try:
             # Get PR data
@@ -88,10 +98,10 @@ class ReviewService:
 
             review.files_changed = len(pr_files)
 
-            # Analyze each file
-            all_findings = []
+            # Analyze files concurrently; each one waits on a GitHub fetch
+            semaphore = asyncio.Semaphore(self.FILE_FETCH_CONCURRENCY)
 
-            for file_data in pr_files:
+            async def analyze_file(file_data: dict[str, Any]) -> list:
                 file_path = file_data["filename"]
                 status = file_data["status"]
                 patch = file_data.get("patch", "")
@@ -102,53 +112,68 @@ class ReviewService:
                 # For added/modified files, get content
                 if status in ("added", "modified"):
                     try:
-                        content = await self.github_service.get_file_content(
-                            installation_id=installation_id,
-                            owner=repo.owner,
-                            repo=repo.name,
-                            path=file_path,
-                            ref=review.head_sha,
-                        )
-
-                        findings = self.analyzer.analyze_file(
+                        async with semaphore:
+                            content = await self.github_service.get_file_content(
+                                installation_id=installation_id,
+                                owner=repo.owner,
+                                repo=repo.name,
+                                path=file_path,
+                                ref=review.head_sha,
+                            )
+
+                        # Pattern matching is CPU-bound; keep it off the event
+                        # loop so other files' fetches progress meanwhile
+                        return await asyncio.to_thread(
+                            self.analyzer.analyze_file,
                             file_path=file_path,
                             content=content,
                             diff_lines=diff_lines,
                         )
-                        all_findings.extend(findings)
 
                     except Exception as e:
                         logger.warning(f"Failed to analyze file {file_path}: {e}")
-                        continue
+                        return []
 
                 # For any file, check if it's a dangerous file type
                 elif status == "added":
-                    findings = self.analyzer.analyze_file(
+                    return self.analyzer.analyze_file(
                         file_path=file_path,
                         content="",
                         diff_lines=None,
                     )
-                    all_findings.extend(findings)
-
-            # Store findings
-            for finding in all_findings:
-                pr_finding = PRFinding(
-                    pr_review_id=review.id,
-                    repo_id=repo_id,
-                    severity=finding.severity.value,
-                    category=finding.category.value,
-                    file_path=finding.file_path,
-                    start_line=finding.start_line,
-                    end_line=finding.end_line,
-                    evidence=finding.evidence,
-                )
-                self.db.add(pr_finding)
+
+                return []
+
+            results = await asyncio.gather(*(analyze_file(fd) for fd in pr_files))
+            all_findings = list(chain.from_iterable(results))
 
             # Generate explanations for critical findings only
             critical_findings = [f for f in all_findings if f.severity == self.Severity.CRITICAL]
             if critical_findings:
                 await self._add_explanations(critical_findings)
 
+            # Store findings in one bulk insert, after explanations are added
+            # to their evidence
+            if all_findings:
+                # Findings reference the review row, so write it first
+                await self.db.flush()
+                await self.db.execute(
+                    insert(PRFinding),
+                    [
+                        {
+                            "pr_review_id": review.id,
+                            "repo_id": repo_id,
+                            "severity": finding.severity.value,
+                            "category": finding.category.value,
+                            "file_path": finding.file_path,
+                            "start_line": finding.start_line,
+                            "end_line": finding.end_line,
+                            "evidence": finding.evidence,
+                        }
+                        for finding in all_findings
+                    ],
+                )
+
             # Post to GitHub
             await self._post_review(repo, review, all_findings, installation_id)
 
@@ -176,32 +201,41 @@ class ReviewService:
         lines = []
         current_line = 0
 
+        append = lines.append
         for line in patch.split("\n"):
-            if line.startswith("@@"):
-                # Parse @@ -start,count +start,count @@
-                match = re.search(r"\+(\d+)", line)
+            # Dispatch on the first character; most lines are context lines
+            first = line[:1]
+            if first == "@" and line.startswith("@@"):
+                match = _HUNK_START_RE.search(line)
                 if match:
                     current_line = int(match.group(1)) - 1
-            elif line.startswith("+") and not line.startswith("+++"):
+            elif first == "+" and not line.startswith("+++"):
                 current_line += 1
-                lines.append(current_line)
-            elif not line.startswith("-"):
+                append(current_line)
+            elif first != "-":
                 current_line += 1
 
         return lines
 
     async def _add_explanations(self, findings: list) -> None:
         """Add LLM explanations to critical findings."""
-        for finding in findings[:5]:  # Limit to 5 explanations
-            prompt = f"""Explain this security finding in 2 sentences and suggest a fix in 1 sentence.
+        findings = findings[:5]  # Limit to 5 explanations
+        prompts = [
+            f"""Explain this security finding in 2 sentences and suggest a fix in 1 sentence.
 
 Finding: {finding.evidence.get('reason', '')}
 File: {finding.file_path}
 Code: {finding.evidence.get('snippet', '')}
 
 Be concise and actionable."""
+            for finding in findings
+        ]
 
-            explanation = await self.llm_service.generate(prompt, max_tokens=150)
+        # Independent requests; wait on all of them at once
+        explanations = await asyncio.gather(
+            *(self.llm_service.generate(prompt, max_tokens=150) for prompt in prompts)
+        )
+        for finding, explanation in zip(findings, explanations):
             finding.evidence["explanation"] = explanation
 
     async def _post_review(
@@ -224,10 +258,17 @@ Be concise and actionable."""
             )
             return
 
-        # Build summary
-        critical = [f for f in findings if f.severity == self.Severity.CRITICAL]
-        warnings = [f for f in findings if f.severity == self.Severity.WARNING]
-        info = [f for f in findings if f.severity == self.Severity.INFO]
+        # Build summary, bucketing findings by severity in one pass
+        critical, warnings, info = [], [], []
+        buckets = {
+            self.Severity.CRITICAL: critical,
+            self.Severity.WARNING: warnings,
+            self.Severity.INFO: info,
+        }
+        for f in findings:
+            bucket = buckets.get(f.severity)
+            if bucket is not None:
+                bucket.append(f)
 
         body_parts = ["**CodeProof Review**\n"]
 
@@ -1,8 +1,10 @@
 """Scan service for repo intelligence."""
 
+import asyncio
 import hashlib
 import logging
 import os
+import uuid
 from datetime import datetime
 from typing import Any
 
@@ -18,6 +20,7 @@ from app.analyzers import (
     ReliabilityAnalyzer,
     SecurityAnalyzer,
 )
+from app.config import get_settings
 from app.models.repository import Repository
 from app.models.scan import (
     ControlFramework,
@@ -30,10 +33,11 @@ from app.models.scan import (
     FixPack,
     ScanRun,
 )
+from app.services.ast_cache import AstCache
 from app.services.clone_service import CloneService
-from app.services.coverage_service import CoverageService
+from app.services.coverage_service import CoverageReport, CoverageService
 from app.services.evidence_service import EvidenceService
-from app.services.parser_service import ParserService, TREE_SITTER_AVAILABLE
+from app.services.parser_service import ParseResult, ParserService, TREE_SITTER_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
@@ -160,13 +164,12 @@ class ScanService:
                 scan_run.ref = ref
             await self.db.commit()
 
-            self.coverage_service.reset()
-            self.coverage_service.discover_files(clone_path)
-            parse_result = self.parser_service.parse_repository(
-                clone_path,
-                coverage_service=self.coverage_service,
+            enabled = set((scan_run.config or {}).get("analyzers_enabled") or [])
+            # Parsing and analysis are synchronous CPU work; run them off the
+            # event loop so other requests are served meanwhile
+            parse_result, coverage_report, file_contents, matches = await asyncio.to_thread(
+                self._analyze_repository, clone_path, enabled
             )
-            coverage_report = self.coverage_service.compute_coverage()
 
             degraded_modes = []
             if not TREE_SITTER_AVAILABLE:
@@ -176,24 +179,8 @@ class ScanService:
             if coverage_report.parse_errors:
                 degraded_modes.append("parse_errors")
 
-            file_contents = self._load_file_contents(clone_path)
             file_snapshot_map = await self._store_file_snapshots(scan_run, file_contents)
 
-            context = AnalyzerContext(
-                repo_path=clone_path,
-                file_contents=file_contents,
-                parse_result=parse_result,
-                coverage_report=coverage_report,
-            )
-
-            enabled = set((scan_run.config or {}).get("analyzers_enabled") or [])
-            matches = []
-            for analyzer in self.analyzers:
-                if enabled and analyzer.name not in enabled:
-                    continue
-                self.coverage_service.record_analyzer_run(analyzer.name)
-                matches.extend(analyzer.analyze(context))
-
             await self._store_findings(scan_run, matches, file_snapshot_map, file_contents, coverage_report)
             await self._store_coverage(scan_run, coverage_report, degraded_modes)
             await self._store_control_results(scan_run, matches)
@@ -211,6 +198,50 @@ class ScanService:
             if clone_path:
                 self.clone_service.cleanup(clone_path)
 
+    def _analyze_repository(
+        self, clone_path: str, enabled: set[str]
+    ) -> tuple[ParseResult, CoverageReport, dict[str, str], list[Any]]:
+        """Parse the clone and run the enabled analyzers over it.
+
+        Runs in a worker thread, so the AST cache is opened and closed here:
+        its SQLite connection may only be used by the thread that created it.
+        """
+        self.coverage_service.reset()
+        self.coverage_service.discover_files(clone_path)
+        # The AST cache is only needed while parsing; most ScanService
+        # instances serve requests that never parse anything
+        self.parser_service.ast_cache = AstCache.open(get_settings().ast_cache_dir)
+        try:
+            parse_result = self.parser_service.parse_repository(
+                clone_path,
+                coverage_service=self.coverage_service,
+            )
+        finally:
+            if self.parser_service.ast_cache is not None:
+                self.parser_service.ast_cache.close()
+                self.parser_service.ast_cache = None
+        coverage_report = self.coverage_service.compute_coverage()
+
+        file_contents = self._load_file_contents(clone_path)
+        context = AnalyzerContext(
+            repo_path=clone_path,
+            file_contents=file_contents,
+            parse_result=parse_result,
+            coverage_report=coverage_report,
+        )
+        matches = self._run_analyzers(context, enabled)
+        return parse_result, coverage_report, file_contents, matches
+
+    def _run_analyzers(self, context: AnalyzerContext, enabled: set[str]) -> list[Any]:
+        """Run the enabled analyzers (all when enabled is empty) over context."""
+        matches = []
+        for analyzer in self.analyzers:
+            if enabled and analyzer.name not in enabled:
+                continue
+            self.coverage_service.record_analyzer_run(analyzer.name)
+            matches.extend(analyzer.analyze(context))
+        return matches
+
     async def _get_scan_run(self, scan_run_id: str) -> ScanRun:
         result = await self.db.execute(select(ScanRun).where(ScanRun.id == scan_run_id))
         scan_run = result.scalar_one_or_none()
@@ -243,21 +274,23 @@ class ScanService:
     ) -> dict[str, FileSnapshot]:
         snapshot_map: dict[str, FileSnapshot] = {}
         for path, content in file_contents.items():
-            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            data = content.encode("utf-8")
+            content_hash = hashlib.sha256(data).hexdigest()
             ext = os.path.splitext(path)[1].lower()
             language = self.parser_service.SUPPORTED_LANGUAGES.get(ext)
             snapshot = FileSnapshot(
+                id=uuid.uuid4(),
                 scan_run_id=scan_run.id,
                 path=path,
                 language=language,
                 content_hash=content_hash,
-                size_bytes=len(content.encode("utf-8")),
+                size_bytes=len(data),
                 is_binary=False,
                 stored_at=f"sha256:{content_hash}",
             )
-            self.db.add(snapshot)
-            await self.db.flush()
             snapshot_map[path] = snapshot
+        # One unit of work inserts every snapshot in a batch
+        self.db.add_all(snapshot_map.values())
         await self.db.commit()
         return snapshot_map
 
@@ -270,6 +303,8 @@ class ScanService:
         coverage_report: Any,
     ) -> None:
         dedupe_map: dict[str, Finding] = {}
+        evidence_snippets: list[EvidenceSnippet] = []
+        instances: list[FindingInstance] = []
         for match in matches:
             adjusted_confidence = self._adjust_confidence(match.confidence, coverage_report)
             dedupe_key = self._dedupe_key(match)
@@ -282,6 +317,7 @@ class ScanService:
                     "verification_factor": 0.0,
                 }
                 finding = Finding(
+                    id=uuid.uuid4(),
                     scan_run_id=scan_run.id,
                     category=match.category,
                     rule_id=match.rule_id,
@@ -296,8 +332,6 @@ class ScanService:
                     tags=match.tags,
                     dedupe_key=dedupe_key,
                 )
-                self.db.add(finding)
-                await self.db.flush()
                 dedupe_map[dedupe_key] = finding
 
             snapshot = file_snapshot_map.get(match.file_path)
@@ -309,6 +343,7 @@ class ScanService:
             )
             snippet_hash = self.evidence_service.hash_snippet(snippet_text)
             evidence = EvidenceSnippet(
+                id=uuid.uuid4(),
                 file_snapshot_id=snapshot.id,
                 start_line=match.start_line,
                 end_line=match.end_line,
@@ -317,8 +352,7 @@ class ScanService:
                 context_before_lines=context_before,
                 context_after_lines=context_after,
             )
-            self.db.add(evidence)
-            await self.db.flush()
+            evidence_snippets.append(evidence)
 
             instance = FindingInstance(
                 finding_id=finding.id,
@@ -327,8 +361,13 @@ class ScanService:
                 source_to_sink_trace_id=None,
                 retrieval_score=None,
             )
-            self.db.add(instance)
+            instances.append(instance)
 
+        # Ids are assigned up front, so nothing needs flushing mid-loop; the
+        # commit inserts each table in one batch, parents first
+        self.db.add_all(dedupe_map.values())
+        self.db.add_all(evidence_snippets)
+        self.db.add_all(instances)
         await self.db.commit()
 
     async def _store_coverage(self, scan_run: ScanRun, coverage_report: Any, degraded_modes: list[str]) -> None:
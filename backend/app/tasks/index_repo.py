@@ -18,6 +18,7 @@ from app.config import get_settings
 from app.models.file import File
 from app.models.repository import Repository
 from app.models.symbol import Symbol as SymbolModel
+from app.services.ast_cache import AstCache
 from app.services.clone_service import CloneService
 from app.services.embedding_service import EmbeddingService
 from app.services.parser_service import ParserService, Symbol
@@ -68,7 +69,7 @@ async def index_repository_async(repo_id: str) -> dict[str, Any]:
     """Async implementation of repository indexing."""
     session_factory = get_async_session()
     clone_service = CloneService()
-    parser_service = ParserService()
+    parser_service = ParserService(ast_cache=AstCache.open(settings.ast_cache_dir))
     embedding_service = EmbeddingService()
     qdrant_client = get_qdrant_client()
 
@@ -316,6 +317,8 @@ async def index_repository_async(repo_id: str) -> dict[str, Any]:
             # Cleanup cloned repo
             if clone_path:
                 clone_service.cleanup(clone_path)
+            if parser_service.ast_cache is not None:
+                parser_service.ast_cache.close()
 
 
 @celery_app.task(bind=True, max_retries=3)
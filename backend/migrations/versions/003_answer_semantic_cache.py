@@ -0,0 +1,31 @@
+"""Add question embeddings to answers for the semantic answer cache.
+
+Revision ID: 003_answer_semantic_cache
+Revises: 002_repo_intelligence
+Create Date: 2025-01-20 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "003_answer_semantic_cache"
+down_revision = "002_repo_intelligence"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("answers", sa.Column("commit_sha", sa.String(length=40), nullable=True))
+    op.add_column(
+        "answers",
+        sa.Column("question_embedding", postgresql.ARRAY(sa.Float()), nullable=True),
+    )
+    op.create_index("idx_answers_repo_commit", "answers", ["repo_id", "commit_sha"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_answers_repo_commit", table_name="answers")
+    op.drop_column("answers", "question_embedding")
+    op.drop_column("answers", "commit_sha")
@@ -0,0 +1,27 @@
+"""Add normalized question hashes to answers for exact answer reuse.
+
+Revision ID: 004_answer_question_hash
+Revises: 003_answer_semantic_cache
+Create Date: 2025-01-21 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "004_answer_question_hash"
+down_revision = "003_answer_semantic_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("answers", sa.Column("question_hash", sa.String(length=64), nullable=True))
+    op.create_index(
+        "idx_answers_question_hash", "answers", ["repo_id", "commit_sha", "question_hash"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_answers_question_hash", table_name="answers")
+    op.drop_column("answers", "question_hash")
@@ -0,0 +1,32 @@
+"""Make the snippet cache location key a covering unique index.
+
+Revision ID: 005_snippet_cache_lookup_index
+Revises: 004_answer_question_hash
+Create Date: 2025-01-22 00:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "005_snippet_cache_lookup_index"
+down_revision = "004_answer_question_hash"
+branch_labels = None
+depends_on = None
+
+_LOCATION_COLUMNS = ["repo_id", "commit_sha", "file_path", "start_line", "end_line"]
+
+
+def upgrade() -> None:
+    op.drop_constraint("uq_snippet_cache_location", "snippet_cache", type_="unique")
+    op.create_index(
+        "uq_snippet_cache_location",
+        "snippet_cache",
+        _LOCATION_COLUMNS,
+        unique=True,
+        postgresql_include=["content", "expires_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_snippet_cache_location", table_name="snippet_cache")
+    op.create_unique_constraint("uq_snippet_cache_location", "snippet_cache", _LOCATION_COLUMNS)
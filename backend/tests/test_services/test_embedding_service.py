@@ -0,0 +1,45 @@
+"""Tests for embedding service."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services import embedding_service
+from app.services.embedding_service import EmbeddingService
+
+
+class TestEmbedQuery:
+    """Test query embedding."""
+
+    @pytest.fixture
+    def service(self):
+        """Create EmbeddingService with a mocked client and an empty cache."""
+        with patch.object(EmbeddingService, "_init_client"):
+            service = EmbeddingService()
+        service.client = MagicMock()
+        service.client.models.embed_content.side_effect = lambda model, contents: MagicMock(
+            embeddings=[MagicMock(values=[float(len(contents[0])), 1.0])]
+        )
+        with patch.object(embedding_service, "_query_embedding_cache", embedding_service.OrderedDict()):
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_is_embedded_once(self, service):
+        """Serves a repeated question from the in-process cache."""
+        first = await service.embed_query("how does login work")
+        second = await service.embed_query("how does login work")
+
+        assert first == second == [19.0, 1.0]
+        assert service.client.models.embed_content.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_least_recently_used(self, service):
+        """Keeps at most QUERY_CACHE_SIZE entries."""
+        service.QUERY_CACHE_SIZE = 2
+        await service.embed_query("a")
+        await service.embed_query("b")
+        await service.embed_query("a")
+        await service.embed_query("c")  # evicts "b"
+        await service.embed_query("a")
+        await service.embed_query("b")
+
+        assert service.client.models.embed_content.call_count == 4
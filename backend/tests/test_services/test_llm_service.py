@@ -87,6 +87,7 @@ class TestLLMServiceGenerateWithUsage:
         mock_response.usage_metadata = MagicMock()
         mock_response.usage_metadata.prompt_token_count = 100
         mock_response.usage_metadata.candidates_token_count = 50
+        mock_response.usage_metadata.cached_content_token_count = 80
 
         llm_service._mock_client.models.generate_content.return_value = mock_response
 
@@ -95,6 +96,7 @@ class TestLLMServiceGenerateWithUsage:
         assert text == "Generated text"
         assert usage["input_tokens"] == 100
         assert usage["output_tokens"] == 50
+        assert usage["cached_input_tokens"] == 80
 
     @pytest.mark.asyncio
     async def test_generate_with_usage_handles_no_metadata(self, llm_service):
@@ -110,6 +112,7 @@ class TestLLMServiceGenerateWithUsage:
         assert text == "Generated text"
         assert usage["input_tokens"] == 0
         assert usage["output_tokens"] == 0
+        assert usage["cached_input_tokens"] == 0
 
 
 class TestLLMServiceEmbeddings:
@@ -0,0 +1,469 @@
+"""Tests for tree-sitter parser service."""
+
+import hashlib
+
+import pytest
+
+from app.services.ast_cache import AstCache, ContentHashBloomFilter
+from app.services.parser_service import TREE_SITTER_AVAILABLE, ParserService
+
+requires_tree_sitter = pytest.mark.skipif(
+    not TREE_SITTER_AVAILABLE, reason="tree-sitter not installed"
+)
+
+
+class TestParserServicePython:
+    """Test Python extraction."""
+
+    @pytest.fixture
+    def service(self):
+        """Create ParserService."""
+        return ParserService()
+
+    @requires_tree_sitter
+    def test_extracts_class_and_methods_in_order(self, service, sample_python_class):
+        """Emits the class followed by its methods in source order."""
+        symbols, _, _ = service.parse_file("calc.py", sample_python_class, "python")
+
+        assert [s.qualified_name for s in symbols] == [
+            "calc.py:Calculator",
+            "calc.py:Calculator.__init__",
+            "calc.py:Calculator.add",
+            "calc.py:Calculator.subtract",
+        ]
+        assert symbols[1].visibility == "magic"
+        assert symbols[2].type == "method"
+
+    @requires_tree_sitter
+    def test_extracts_calls_with_caller_context(self, service):
+        """Attributes calls to the enclosing function or method."""
+        content = (
+            "setup()\n"
+            "def run():\n"
+            "    helper()\n"
+            "class Job:\n"
+            "    def go(self):\n"
+            "        self.run()\n"
+        )
+        _, _, calls = service.parse_file("job.py", content, "python")
+
+        assert [(c.caller, c.callee) for c in calls] == [
+            ("job.py:module", "setup"),
+            ("job.py:run", "helper"),
+            ("job.py:Job.go", "self.run"),
+        ]
+
+    @requires_tree_sitter
+    def test_deeply_nested_code_does_not_overflow(self, service):
+        """Handles nesting deeper than the Python recursion limit."""
+        depth = 1500
+        content = "x = " + "[" * depth + "f()" + "]" * depth + "\n"
+
+        _, _, calls = service.parse_file("deep.py", content, "python")
+
+        assert [c.callee for c in calls] == ["f"]
+
+
+class TestContentHashBloomFilter:
+    """Test the content-hash bloom filter."""
+
+    def test_added_digest_is_member(self):
+        """Reports digests that were added."""
+        bloom = ContentHashBloomFilter()
+        digest = hashlib.sha256(b"print('hi')").digest()
+
+        assert digest not in bloom
+        bloom.add(digest)
+        assert digest in bloom
+
+    def test_round_trips_through_disk(self, tmp_path):
+        """Persists and reloads its bit table."""
+        path = tmp_path / "bloom.bin"
+        digest = hashlib.sha256(b"x = 1").digest()
+        bloom = ContentHashBloomFilter()
+        bloom.add(digest)
+        bloom.save(path)
+
+        assert digest in ContentHashBloomFilter.load(path)
+        assert digest not in ContentHashBloomFilter.load(tmp_path / "missing.bin")
+
+    def test_save_keeps_digests_saved_by_another_process(self, tmp_path):
+        """Merges with the on-disk filter instead of overwriting it."""
+        path = tmp_path / "bloom.bin"
+        first, second = ContentHashBloomFilter(), ContentHashBloomFilter()
+        a, b = hashlib.sha256(b"a").digest(), hashlib.sha256(b"b").digest()
+        first.add(a)
+        second.add(b)
+        first.save(path)
+        second.save(path)
+
+        merged = ContentHashBloomFilter.load(path)
+        assert a in merged and b in merged
+        assert [p.name for p in tmp_path.iterdir()] == ["bloom.bin"]
+
+    def test_failed_save_is_not_fatal(self, tmp_path):
+        """Logs and carries on when the filter cannot be written."""
+        ContentHashBloomFilter().save(tmp_path / "missing-dir" / "bloom.bin")
+
+
+class TestParserServiceRepository:
+    """Test repository-level file filtering."""
+
+    @pytest.fixture
+    def service(self):
+        """Create ParserService."""
+        return ParserService()
+
+    def test_skips_generated_single_line_file(self, service, tmp_path):
+        """Skips files whose first chunk looks minified."""
+        from app.services.coverage_service import CoverageService
+
+        (tmp_path / "app.js").write_text("function ok() {}\n")
+        (tmp_path / "bundle.js").write_text("var a=1;" * 20000)
+        coverage = CoverageService()
+
+        result = service.parse_repository(str(tmp_path), coverage)
+
+        assert result.files_parsed == 1
+        assert coverage.files_skipped["looks_generated"] == ["bundle.js"]
+
+    def test_skips_binary_file_with_source_extension(self, service, tmp_path):
+        """Skips files containing NUL bytes even with a parseable extension."""
+        from app.services.coverage_service import CoverageService
+
+        (tmp_path / "blob.py").write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+        coverage = CoverageService()
+
+        result = service.parse_repository(str(tmp_path), coverage)
+
+        assert result.files_parsed == 0
+        assert coverage.files_skipped["binary"] == ["blob.py"]
+
+    def test_parse_error_in_one_file_keeps_the_rest(self, service, tmp_path):
+        """Records a failing file without dropping results for the others."""
+        from app.services.coverage_service import CoverageService
+
+        for name in ("a.rb", "b.rb", "c.rb"):
+            (tmp_path / name).write_text(f"def {name[0]}()\n")
+        parse_content = service._parse_content
+
+        def flaky(file_path, content, language):
+            if file_path == "b.rb":
+                raise ValueError("boom")
+            return parse_content(file_path, content, language)
+
+        service._parse_content = flaky
+        coverage = CoverageService()
+
+        result = service.parse_repository(str(tmp_path), coverage)
+
+        assert sorted(s.name for s in result.symbols) == ["a", "c"]
+        assert result.files_parsed == 2
+        assert result.parse_errors == ["b.rb: boom"]
+
+
+class TestParserServiceFallback:
+    """Test regex fallback parsing."""
+
+    @pytest.fixture
+    def service(self):
+        """Create ParserService."""
+        return ParserService()
+
+    def test_js_fallback_extracts_classes_functions_imports(self, service):
+        """Finds each kind of declaration with its line number."""
+        content = (
+            "import React from 'react';\n"
+            "class Widget extends Base {}\n"
+            "const render = async (props) => props;\n"
+            "function mount(el) {}\n"
+        )
+        symbols, imports, _ = service._parse_js_fallback("w.js", content)
+
+        assert [(s.type, s.name, s.line_start) for s in symbols] == [
+            ("class", "Widget", 2),
+            ("function", "render", 3),
+            ("function", "mount", 4),
+        ]
+        assert [(i.module, i.line) for i in imports] == [("react", 1)]
+
+    def test_generic_fallback_extracts_classes_and_functions(self, service):
+        """Matches declarations across language keywords."""
+        content = "class Foo\n  def bar(x)\nend\nfunc Baz() {}\n"
+        symbols, _, _ = service._parse_fallback("x.rb", content, "ruby")
+
+        assert [(s.type, s.name, s.line_start) for s in symbols] == [
+            ("class", "Foo", 1),
+            ("function", "bar", 2),
+            ("function", "Baz", 4),
+        ]
+
+    def test_fallback_matches_do_not_span_lines(self, service):
+        """Keeps keyword and name on the same line, as line-by-line scanning did."""
+        content = "class\nFoo\nfunction\nbar() {}\nclass Baz {}\n"
+        symbols, _, _ = service._parse_js_fallback("x.js", content)
+
+        assert [(s.name, s.line_start) for s in symbols] == [("Baz", 5)]
+
+    def test_fallback_keeps_non_ascii_identifiers(self, service):
+        """Matches whole Unicode names with either regex engine."""
+        content = "function función() {}\nconst añadir = async (x) => x;\n"
+        symbols, _, _ = service._parse_js_fallback("x.js", content)
+
+        assert [s.name for s in symbols] == ["función", "añadir"]
+
+    def test_keyword_anchored_scan_matches_finditer(self, monkeypatch):
+        """Finds the same non-overlapping matches as a full-buffer scan."""
+        import re
+
+        from app.services import parser_service
+
+        monkeypatch.setattr(parser_service, "_scan_re", re)
+        pattern = re.compile(r"class\s+(?P<cls>\w+)|def\s+(?P<fn>\w+)")
+        content = "classdef x\nclass def y\nsubclass Z def w\ndef\n"
+
+        anchored = parser_service._find_matches(pattern, content, ("class", "def"))
+
+        assert [m.span() for m in anchored] == [m.span() for m in pattern.finditer(content)]
+
+
+class TestParserServiceJavaScript:
+    """Test JavaScript extraction."""
+
+    @pytest.fixture
+    def service(self):
+        """Create ParserService."""
+        return ParserService()
+
+    @requires_tree_sitter
+    def test_extracts_class_methods_and_imports(self, service):
+        """Emits classes before their methods and collects import names."""
+        content = (
+            "import React, { useState } from 'react';\n"
+            "export class Store {\n"
+            "  get(key) { return key; }\n"
+            "}\n"
+            "export const load = (id) => id;\n"
+        )
+        symbols, imports, _ = service.parse_file("store.js", content, "javascript")
+
+        assert [(s.type, s.qualified_name) for s in symbols] == [
+            ("class", "store.js:Store"),
+            ("method", "store.js:Store.get"),
+            ("function", "store.js:load"),
+        ]
+        assert symbols[0].children == ["get"]
+        assert imports[0].module == "react"
+        assert imports[0].imported_names == ["React", "useState"]
+
+    @requires_tree_sitter
+    def test_assigns_import_names_to_their_statement(self, service):
+        """Keeps names with their own import and skips namespace bindings."""
+        content = (
+            "import './polyfill';\n"
+            "import * as path from 'path';\n"
+            "import { a, b as c } from './util';\n"
+            "import d from './d';\n"
+        )
+        _, imports, _ = service.parse_file("x.ts", content, "typescript")
+
+        assert [(i.module, i.line, i.imported_names) for i in imports] == [
+            ("./polyfill", 1, []),
+            ("path", 2, []),
+            ("./util", 3, ["a", "b"]),
+            ("./d", 4, ["d"]),
+        ]
+
+    @requires_tree_sitter
+    def test_deeply_nested_code_does_not_overflow(self, service):
+        """Handles nesting deeper than the Python recursion limit."""
+        depth = 1500
+        content = "const x = " + "[" * depth + "1" + "]" * depth + ";\nfunction f() {}\n"
+
+        symbols, _, _ = service.parse_file("deep.js", content, "javascript")
+
+        assert [s.name for s in symbols] == ["f"]
+
+
+class TestParserServiceAstCache:
+    """Test the persistent AST cache."""
+
+    @requires_tree_sitter
+    def test_unchanged_content_is_served_from_cache(self, tmp_path, sample_python_class):
+        """Skips tree-sitter for content parsed in an earlier run."""
+        first = ParserService(ast_cache=AstCache(tmp_path))
+        expected = first.parse_file("calc.py", sample_python_class, "python")
+        first.ast_cache.close()
+
+        second = ParserService(ast_cache=AstCache(tmp_path))
+        second._parse_content = None  # any cache miss would fail loudly
+        cached = second.parse_file("calc.py", sample_python_class, "python")
+
+        assert cached == expected
+
+    @requires_tree_sitter
+    def test_changed_content_is_reparsed(self, tmp_path):
+        """Keys entries on content, not just path."""
+        service = ParserService(ast_cache=AstCache(tmp_path))
+        service.parse_file("m.py", "def a():\n    pass\n", "python")
+        symbols, _, _ = service.parse_file("m.py", "def b():\n    pass\n", "python")
+
+        assert [s.name for s in symbols] == ["b"]
+
+    def test_open_without_directory_disables_cache(self):
+        """Returns None when no cache directory is configured."""
+        assert AstCache.open("") is None
+
+    @requires_tree_sitter
+    def test_repository_reparse_is_served_from_cache(self, tmp_path, sample_python_class):
+        """Keeps file order when every file is a cache hit."""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        for name in ("a.py", "b.py", "c.py"):
+            (repo / name).write_text(sample_python_class)
+        cache_dir = tmp_path / "cache"
+        first = ParserService(ast_cache=AstCache(cache_dir)).parse_repository(str(repo))
+
+        second = ParserService(ast_cache=AstCache(cache_dir))
+        second._parse_content = None  # any cache miss would fail loudly
+        cached = second.parse_repository(str(repo))
+
+        assert cached.symbols == first.symbols
+        assert cached.files_parsed == 3
+
+    def test_entries_are_committed_in_batches(self, tmp_path, monkeypatch):
+        """Another connection sees entries once a batch fills, before flush."""
+        import sqlite3
+
+        monkeypatch.setattr(AstCache, "COMMIT_BATCH_SIZE", 2)
+        cache = AstCache(tmp_path)
+        reader = sqlite3.connect(tmp_path / AstCache.DB_FILENAME)
+
+        def count():
+            return reader.execute("SELECT COUNT(*) FROM ast").fetchone()[0]
+
+        cache.put("a.py", hashlib.sha256(b"a").digest(), [], [], [])
+        assert count() == 0
+        cache.put("b.py", hashlib.sha256(b"b").digest(), [], [], [])
+        assert count() == 2
+        cache.close()
+
+    def test_unreadable_entry_is_a_miss(self, tmp_path):
+        """Treats a corrupt row as a cache miss instead of raising."""
+        digest = hashlib.sha256(b"x").digest()
+        cache = AstCache(tmp_path)
+        cache.put("x.py", digest, [], [], [])
+        cache._conn.execute("UPDATE ast SET symbols = ?", (b"not a pickle",))
+
+        assert cache.get("x.py", digest) is None
+        cache.close()
+
+    def test_close_prunes_stale_and_excess_entries(self, tmp_path, monkeypatch):
+        """Drops entries unused for too long, then the least recently used."""
+        import sqlite3
+
+        monkeypatch.setattr(AstCache, "MAX_ENTRIES", 2)
+        cache = AstCache(tmp_path)
+        for name in ("old", "a", "b", "c"):
+            cache.put(f"{name}.py", hashlib.sha256(name.encode()).digest(), [], [], [])
+        cache.commit()
+        now = cache._conn.execute("SELECT MAX(last_used) FROM ast").fetchone()[0]
+        ages = {"old.py": AstCache.MAX_AGE_SECONDS + 1, "a.py": 30, "b.py": 20, "c.py": 10}
+        for path, age in ages.items():
+            cache._conn.execute("UPDATE ast SET last_used = ? WHERE path = ?", (now - age, path))
+        cache.commit()
+        cache.close()
+
+        reader = sqlite3.connect(tmp_path / AstCache.DB_FILENAME)
+        paths = sorted(row[0] for row in reader.execute("SELECT path FROM ast"))
+        assert paths == ["b.py", "c.py"]
+
+    def test_close_drops_pruned_digests_from_bloom(self, tmp_path):
+        """The saved filter only covers entries that survived pruning."""
+        stale = hashlib.sha256(b"stale").digest()
+        live = hashlib.sha256(b"live").digest()
+        cache = AstCache(tmp_path)
+        cache.put("stale.py", stale, [], [], [])
+        cache.put("live.py", live, [], [], [])
+        cache._conn.execute("UPDATE ast SET last_used = 0 WHERE path = 'stale.py'")
+        cache.flush()
+        assert stale in ContentHashBloomFilter.load(tmp_path / AstCache.BLOOM_FILENAME)
+        cache.close()
+
+        bloom = ContentHashBloomFilter.load(tmp_path / AstCache.BLOOM_FILENAME)
+        assert live in bloom
+        assert stale not in bloom
+
+    def test_hits_refresh_last_used(self, tmp_path):
+        """A cache hit keeps its entry from aging out."""
+        digest = hashlib.sha256(b"x").digest()
+        cache = AstCache(tmp_path)
+        cache.put("x.py", digest, [], [], [])
+        cache._conn.execute("UPDATE ast SET last_used = 0")
+        cache.commit()
+
+        assert cache.get("x.py", digest) == ([], [], [])
+        cache.flush()
+
+        last_used = cache._conn.execute("SELECT last_used FROM ast").fetchone()[0]
+        assert last_used > 0
+        cache.close()
+
+    def test_locked_database_is_a_miss(self, tmp_path, monkeypatch):
+        """Falls back to parsing when another process holds the write lock."""
+        import sqlite3
+
+        monkeypatch.setattr(AstCache, "BUSY_TIMEOUT_SECONDS", 0.01)
+        digest = hashlib.sha256(b"x").digest()
+        holder = AstCache(tmp_path)
+        holder.put("x.py", digest, [], [], [])
+        holder.flush()
+
+        other = AstCache(tmp_path)
+        locker = sqlite3.connect(tmp_path / AstCache.DB_FILENAME)
+        locker.execute("BEGIN EXCLUSIVE")
+        try:
+            other.put("y.py", hashlib.sha256(b"y").digest(), [], [], [])
+            other.commit()
+        finally:
+            locker.rollback()
+        other.close()
+        holder.close()
+
+    def test_fallback_results_are_not_cached(self, tmp_path):
+        """Keeps regex output from a failed tree-sitter parse out of the cache."""
+        content = "def a():\n    pass\n"
+        service = ParserService(ast_cache=AstCache(tmp_path))
+        # Claim a grammar that cannot build a parser, forcing the fallback path
+        service.languages = {"python": None}
+
+        symbols, _, _ = service.parse_file("m.py", content, "python")
+
+        assert [s.name for s in symbols] == ["a"]
+        assert service.ast_cache.get("m.py", hashlib.sha256(content.encode()).digest()) is None
+
+
+class TestParserServiceBatching:
+    """Test bounded-batch repository parsing."""
+
+    def test_small_batches_keep_walk_order(self, tmp_path, monkeypatch):
+        """Emits the same symbols in the same order whatever the batch size."""
+        for name in ("a.rb", "b.rb", "c.rb", "d.rb", "e.rb"):
+            (tmp_path / name).write_text(f"def {name[0]}()\n")
+        expected = ParserService().parse_repository(str(tmp_path))
+
+        monkeypatch.setattr(ParserService, "PARSE_BATCH_FILES", 2)
+        service = ParserService()
+        batch_sizes = []
+        parse_pending = service._parse_pending
+
+        def recording(pending, *args):
+            batch_sizes.append(len(pending))
+            return parse_pending(pending, *args)
+
+        service._parse_pending = recording
+        result = service.parse_repository(str(tmp_path))
+
+        assert batch_sizes == [2, 2, 1]
+        assert result.symbols == expected.symbols
+        assert result.files_parsed == 5
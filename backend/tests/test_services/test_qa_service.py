@@ -8,6 +8,9 @@ Tests the complete Q&A flow:
 5. Citation building
 """
 
+import asyncio
+from functools import partial
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from dataclasses import dataclass
@@ -82,6 +85,25 @@ class TestKeywordExtraction:
         assert len(keywords) <= 5
 
 
+class TestTrigramSearch:
+    """Test the symbol search query."""
+
+    @pytest.mark.asyncio
+    async def test_full_text_match_uses_every_keyword(self):
+        """ORs all keywords into the full-text query, not just the first."""
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=[])
+        service = QAService(db, None, None, None)
+
+        await service._trigram_search("repo-123", "How does AuthService refresh tokens?")
+
+        params = db.execute.await_args.args[1]
+        assert params["text_query"] == " or ".join(
+            service._extract_keywords("How does AuthService refresh tokens?")
+        )
+        assert params["text_query"].count(" or ") >= 2
+
+
 class TestAnswerParsing:
     """Test JSON answer parsing."""
 
@@ -144,6 +166,61 @@ class TestAnswerParsing:
 
         assert parsed is None
 
+    def test_parse_accepts_json_only_the_stdlib_decodes(self):
+        """Falls back to json for literals orjson rejects."""
+        service = QAService(MagicMock(), None, None, None)
+
+        parsed = service._parse_answer_json(
+            '{"sections": [], "unknowns": [], "score": NaN, "id": 123456789012345678901}'
+        )
+
+        assert parsed["id"] == 123456789012345678901
+
+    def test_repair_fixes_commas_keys_and_control_characters_together(self):
+        """Applies every repair in a single pass over the text."""
+        service = QAService(MagicMock(), None, None, None)
+
+        repaired = service._repair_json('{sections: [{text: "a\x01b", source_ids: [1,],},],\n}')
+
+        assert repaired == '{"sections": [{"text": "ab","source_ids": [1]}]}'
+
+    def test_parse_uses_local_repair_for_truncated_answer(self, monkeypatch):
+        """Accepts a json-repair result only if it has a usable section."""
+        from app.services import qa_service
+
+        service = QAService(MagicMock(), None, None, None)
+        usable = {"sections": [{"text": "Login is here", "source_ids": [1]}]}
+        monkeypatch.setattr(qa_service, "repair_json", lambda text, return_objects: usable)
+
+        assert service._parse_answer_json('{"sections": [{"text": "Login is here", "sou') == usable
+
+        unusable = {"sections": [{"text": "incomplete"}]}
+        monkeypatch.setattr(qa_service, "repair_json", lambda text, return_objects: unusable)
+
+        assert service._parse_answer_json('{"sections": [{"text": "incomplete') is None
+
+    def test_parse_rejects_json_with_wrong_shape(self):
+        """Treats valid JSON that is not an answer object as a parse failure."""
+        service = QAService(MagicMock(), None, None, None)
+
+        assert service._parse_answer_json('["not", "an", "answer"]') is None
+        assert service._parse_answer_json('{"sections": ["text only"]}') is None
+        assert service._parse_answer_json('{"sections": [{"source_ids": 1}]}') is None
+
+    def test_parse_first_object_ignores_braces_in_strings(self):
+        """Finds the first object when quotes contain braces and text follows."""
+        service = QAService(MagicMock(), None, None, None)
+
+        response = (
+            '{"sections": [{"text": "Opens a block", "source_ids": [1], '
+            '"quoted_spans": [{"source_id": 1, "quote": "if (ok) {"}]}], '
+            '"unknowns": []} and then {"stray": true}'
+        )
+        parsed = service._parse_answer_json(response)
+
+        assert parsed["sections"][0]["quoted_spans"][0]["quote"] == "if (ok) {"
+        assert "stray" not in parsed
+
 
 class TestAnswerValidation:
     """Test answer validation logic."""
@@ -578,6 +655,215 @@ class TestRetrievedSourceMerging:
             # Should only have 1 source (deduplicated)
             assert len(sources) == 1
 
+    @pytest.mark.asyncio
+    async def test_trigram_and_vector_searches_overlap(self):
+        """Runs both searches concurrently and keeps trigram hits first on ties."""
+        started = []
+        both_started = asyncio.Event()
+        hit = {"file_path": "app/auth.py", "start_line": 10, "end_line": 20, "score": 0.9}
+
+        async def search(kind, *args, **kwargs):
+            started.append(kind)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return [hit]
+
+        embedding_service = AsyncMock()
+        embedding_service.search_repo = AsyncMock(side_effect=partial(search, "vector"))
+        service = QAService(AsyncMock(), embedding_service, AsyncMock(), None)
+
+        with patch.object(service, "_trigram_search", side_effect=partial(search, "trigram")):
+            sources = await service._retrieve_sources("repo-123", "test query")
+
+        assert sorted(started) == ["trigram", "vector"]
+        assert [s.source_type for s in sources] == ["trigram"]
+
+    @pytest.mark.asyncio
+    async def test_failed_vector_search_keeps_trigram_sources(self):
+        """Logs a failing search and merges the results of the other."""
+        embedding_service = AsyncMock()
+        embedding_service.search_repo = AsyncMock(side_effect=RuntimeError("vector store down"))
+        service = QAService(AsyncMock(), embedding_service, AsyncMock(), None)
+        trigram = [{"file_path": "a.py", "start_line": 1, "end_line": 5, "score": 0.4}]
+
+        with patch.object(service, "_trigram_search", return_value=trigram):
+            sources = await service._retrieve_sources("repo-123", "test query")
+
+        assert [s.file_path for s in sources] == ["a.py"]
+
+    @pytest.mark.asyncio
+    async def test_ranks_fused_across_searches(self):
+        """Orders by reciprocal rank fusion and keeps raw scores."""
+        def hit(path, score):
+            return {"file_path": path, "start_line": 1, "end_line": 5, "score": score}
+
+        embedding_service = AsyncMock()
+        embedding_service.search_repo = AsyncMock(
+            return_value=[hit("b.py", 0.95), hit("c.py", 0.9), hit("a.py", 0.8)]
+        )
+        service = QAService(AsyncMock(), embedding_service, AsyncMock(), None)
+        trigram = [hit("a.py", 0.3), hit("d.py", 0.2)]
+
+        with patch.object(service, "_trigram_search", return_value=trigram):
+            sources = await service._retrieve_sources("repo-123", "test query")
+
+        # a.py is in both lists; raw cosine 0.95 no longer outranks it
+        assert [s.file_path for s in sources] == ["a.py", "b.py", "d.py", "c.py"]
+        assert [s.index for s in sources] == [1, 2, 3, 4]
+        assert sources[0].score == 0.3
+
+
+class TestSnippetFetching:
+    """Test GitHub snippet fetching."""
+
+    @pytest.fixture
+    def repo(self):
+        repo = MagicMock()
+        repo.id = "repo-123"
+        repo.last_indexed_commit = "abc123"
+        repo.github_installation_id = 12345
+        repo.owner = "owner"
+        repo.name = "repo"
+        return repo
+
+    def _source(self, index, file_path, start_line, end_line):
+        return RetrievedSource(
+            index=index,
+            file_path=file_path,
+            start_line=start_line,
+            end_line=end_line,
+            content="",
+            symbol_name=None,
+            score=0.9,
+            source_type="trigram",
+        )
+
+    @pytest.mark.asyncio
+    async def test_fetches_each_file_once(self, repo):
+        """Sources in the same file share one GitHub request."""
+        github_service = AsyncMock()
+        github_service.get_file_content = AsyncMock(return_value="a\nb\nc\nd")
+        service = QAService(AsyncMock(), AsyncMock(), None, github_service)
+        sources = [self._source(1, "app/x.py", 1, 2), self._source(2, "app/x.py", 3, 4)]
+
+        with patch.object(service, "_get_cached_snippets", return_value={}), \
+                patch.object(service, "_cache_snippets", return_value=None):
+            await service._fetch_snippets(repo, sources)
+
+        assert github_service.get_file_content.await_count == 1
+        assert [s.content for s in sources] == ["a\nb", "c\nd"]
+
+    @pytest.mark.asyncio
+    async def test_cached_snippets_skip_github(self, repo):
+        """Sources found in the snippet cache are not fetched."""
+        github_service = AsyncMock()
+        github_service.get_file_content = AsyncMock(return_value="x\ny")
+        service = QAService(AsyncMock(), AsyncMock(), None, github_service)
+        sources = [self._source(1, "app/x.py", 1, 1), self._source(2, "app/y.py", 2, 2)]
+        cached = {("app/x.py", 1, 1): "cached line"}
+
+        with patch.object(service, "_get_cached_snippets", return_value=cached), \
+                patch.object(service, "_cache_snippets", return_value=None):
+            await service._fetch_snippets(repo, sources)
+
+        github_service.get_file_content.assert_awaited_once()
+        assert [s.content for s in sources] == ["cached line", "y"]
+
+    @pytest.mark.asyncio
+    async def test_failed_file_does_not_block_others(self, repo):
+        """A failing fetch marks only its own sources."""
+        async def get_file_content(path, **kwargs):
+            if path == "app/missing.py":
+                raise RuntimeError("404")
+            return "def ok(): pass"
+
+        github_service = AsyncMock()
+        github_service.get_file_content = AsyncMock(side_effect=get_file_content)
+        service = QAService(AsyncMock(), AsyncMock(), None, github_service)
+        sources = [self._source(1, "app/missing.py", 1, 1), self._source(2, "app/ok.py", 1, 1)]
+
+        with patch.object(service, "_get_cached_snippets", return_value={}), \
+                patch.object(service, "_cache_snippets", return_value=None):
+            await service._fetch_snippets(repo, sources)
+
+        assert sources[0].content == "[Could not fetch: 404]"
+        assert sources[1].content == "def ok(): pass"
+
+    @pytest.mark.asyncio
+    async def test_cache_snippets_refreshes_existing_rows(self):
+        """An expired row at the same location is overwritten, not kept."""
+        from sqlalchemy.dialects import postgresql
+
+        db = AsyncMock()
+        service = QAService(db, AsyncMock(), None, AsyncMock())
+
+        await service._cache_snippets("repo-1", "abc123", {("app/x.py", 1, 2): "a\nb"})
+
+        stmt, rows = db.execute.await_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (repo_id, commit_sha, file_path, start_line, end_line)" in sql
+        assert "DO UPDATE SET content = excluded.content" in sql
+        assert "expires_at = excluded.expires_at" in sql
+        assert rows[0]["content"] == "a\nb"
+
+    def test_slice_lines_matches_split(self):
+        """Returns the same lines as splitting the whole file."""
+        from app.services.qa_service import _slice_lines
+
+        content = "one\ntwo\n\nfour\n"
+        for start_line in range(0, 7):
+            for end_line in range(0, 7):
+                lines = content.split("\n")
+                expected = "\n".join(lines[max(0, start_line - 1):min(len(lines), end_line)])
+                assert _slice_lines(content, start_line, end_line) == expected
+
+    @pytest.mark.asyncio
+    async def test_fetched_snippets_are_cached_in_one_statement(self, repo):
+        """Writes every new snippet with a single statement, left for the answer's commit."""
+        db = AsyncMock()
+        db.begin_nested = MagicMock()
+        github_service = AsyncMock()
+        github_service.get_file_content = AsyncMock(return_value="a\nb\nc")
+        service = QAService(db, AsyncMock(), None, github_service)
+        sources = [
+            self._source(1, "app/x.py", 1, 1),
+            self._source(2, "app/x.py", 2, 3),
+            self._source(3, "app/y.py", 1, 2),
+        ]
+
+        with patch.object(service, "_get_cached_snippets", return_value={}):
+            await service._fetch_snippets(repo, sources)
+
+        db.execute.assert_awaited_once()
+        rows = db.execute.await_args.args[1]
+        assert [(r["file_path"], r["content"]) for r in rows] == [
+            ("app/x.py", "a"),
+            ("app/x.py", "b\nc"),
+            ("app/y.py", "a\nb"),
+        ]
+        db.commit.assert_not_awaited()
+        db.begin_nested.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_snippet_cache_write_only_rolls_back_savepoint(self, repo):
+        """A cache write error is confined to its savepoint and not raised."""
+        db = AsyncMock()
+        db.begin_nested = MagicMock()
+        db.execute.side_effect = RuntimeError("insert failed")
+        github_service = AsyncMock()
+        github_service.get_file_content = AsyncMock(return_value="a\nb")
+        service = QAService(db, AsyncMock(), None, github_service)
+        sources = [self._source(1, "app/x.py", 1, 1)]
+
+        with patch.object(service, "_get_cached_snippets", return_value={}):
+            await service._fetch_snippets(repo, sources)
+
+        assert sources[0].content == "a"
+        exc_type, _, _ = db.begin_nested.return_value.__aexit__.await_args.args
+        assert exc_type is RuntimeError
+        db.rollback.assert_not_awaited()
+
 
 class TestQAServiceIntegration:
     """Integration tests with mocked dependencies."""
@@ -669,3 +955,231 @@ class TestQAServiceIntegration:
         assert result.answer_text is not None
         assert "Test answer" in result.answer_text
         assert len(result.citations) == 1
+
+
+class TestSemanticAnswerCache:
+    """Test reuse of stored answers for equivalent questions."""
+
+    @pytest.fixture
+    def repo(self):
+        repo = MagicMock()
+        repo.id = "repo-123"
+        repo.full_name = "owner/repo"
+        repo.last_indexed_commit = "abc123"
+        return repo
+
+    def _service(self, candidates, citations=()):
+        db = AsyncMock()
+        answers = MagicMock()
+        answers.all.return_value = candidates
+        cited = MagicMock()
+        cited.scalars.return_value = list(citations)
+        db.execute = AsyncMock(side_effect=[answers, cited])
+        return QAService(db, AsyncMock(), None, None)
+
+    def _candidate(self, embedding):
+        row = MagicMock()
+        row.id = "answer-1"
+        row.question_embedding = embedding
+        row.answer_text = "Login is handled by AuthService [1]"
+        row.unknowns = []
+        row.confidence_tier = "medium"
+        return row
+
+    @pytest.mark.asyncio
+    async def test_similar_question_reuses_stored_answer(self, repo):
+        """Returns the stored answer and citations above the threshold."""
+        citation = MagicMock(
+            source_index=1,
+            file_path="app/auth.py",
+            start_line=10,
+            end_line=20,
+            snippet="def login(): pass",
+            symbol_name="login",
+        )
+        service = self._service([self._candidate([1.0, 0.0, 0.1])], [citation])
+
+        result = await service._find_cached_answer(repo, [1.0, 0.0, 0.0], 0.92)
+
+        assert result.answer_text == "Login is handled by AuthService [1]"
+        assert result.confidence_tier == ConfidenceTier.MEDIUM
+        assert result.citations[0]["github_url"] == (
+            "https://github.com/owner/repo/blob/abc123/app/auth.py#L10-L20"
+        )
+
+    @pytest.mark.asyncio
+    async def test_dissimilar_question_misses(self, repo):
+        """Ignores stored answers below the similarity threshold."""
+        service = self._service([self._candidate([0.0, 1.0, 0.0])])
+
+        assert await service._find_cached_answer(repo, [1.0, 0.0, 0.0], 0.92) is None
+        assert service.db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_exact_question_reuses_stored_answer(self, repo):
+        """Returns the latest answer stored under the same question hash."""
+        service = self._service([])
+        exact = MagicMock()
+        exact.first.return_value = self._candidate(None)
+        cited = MagicMock()
+        cited.scalars.return_value = []
+        service.db.execute = AsyncMock(side_effect=[exact, cited])
+
+        result = await service._find_exact_answer(repo, "hash")
+
+        assert result.answer_text == "Login is handled by AuthService [1]"
+
+    def test_question_hash_ignores_case_and_spacing(self):
+        """Normalizes the question before hashing."""
+        from app.services.qa_service import _question_hash
+
+        assert _question_hash("  How does  LOGIN work?\n") == _question_hash("how does login work?")
+        assert _question_hash("how does login work?") != _question_hash("how does logout work?")
+
+
+class TestStoreAnswer:
+    """Test persisting answers and their citations."""
+
+    @pytest.mark.asyncio
+    async def test_citations_inserted_in_one_statement(self):
+        """Writes all citations with one bulk insert and a single commit."""
+        db = AsyncMock()
+        db.add = MagicMock()
+        llm_service = MagicMock(model="gemini-pro")
+        service = QAService(db, AsyncMock(), llm_service, None)
+        validated = ValidatedAnswer(
+            sections=[AnswerSection(text="Login is here", source_ids=[1, 2])],
+            unknowns=[],
+            confidence_tier=ConfidenceTier.MEDIUM,
+            confidence_factors={},
+            validation_passed=True,
+            validation_errors=[],
+        )
+        citations = [
+            {
+                "source_index": i,
+                "file_path": "app/auth.py",
+                "start_line": i * 10,
+                "end_line": i * 10 + 5,
+                "snippet": "x" * 600,
+            }
+            for i in (1, 2)
+        ]
+
+        await service._store_answer(
+            "repo-123", "user-1", "Where?", validated, "Login is here [1][2]", citations, {}
+        )
+
+        db.execute.assert_awaited_once()
+        rows = db.execute.await_args.args[1]
+        assert [r["source_index"] for r in rows] == [1, 2]
+        assert all(len(r["snippet"]) == 500 and r["symbol_name"] is None for r in rows)
+        db.commit.assert_awaited_once()
+
+
+class TestAnswerPrompt:
+    """Test prompt assembly for answer generation."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_includes_sources_and_question(self):
+        """Substitutes the sources and question into the template."""
+        llm_service = AsyncMock()
+        llm_service.generate_with_usage = AsyncMock(
+            return_value=('{"sections": [], "unknowns": []}', {})
+        )
+        service = QAService(AsyncMock(), AsyncMock(), llm_service, None)
+        source = RetrievedSource(
+            index=1,
+            file_path="app/auth.py",
+            start_line=1,
+            end_line=2,
+            content="def login(): pass",
+            symbol_name="login",
+            score=0.9,
+            source_type="trigram",
+        )
+
+        await service._generate_validated_answer("Where is login?", [source])
+
+        prompt = llm_service.generate_with_usage.await_args.args[0]
+        assert "[Source 1] app/auth.py:1-2 (login)\n```\ndef login(): pass\n```" in prompt
+        assert "QUESTION: Where is login?\n\nSOURCES:\n[Source 1]" in prompt
+        assert prompt.startswith(QAService._PROMPT_PREFIX)
+        assert '"quoted_spans": [' in prompt and "{{" not in prompt
+
+
+class TestGetRepo:
+    """Test repository lookup."""
+
+    @pytest.mark.asyncio
+    async def test_uses_session_identity_map(self):
+        """Looks the repository up by primary key instead of issuing a SELECT."""
+        import uuid
+
+        from app.models.repository import Repository
+
+        db = AsyncMock()
+        repo_id = uuid.uuid4()
+        service = QAService(db, AsyncMock(), None, None)
+
+        repo = await service._get_repo(str(repo_id))
+
+        db.get_one.assert_awaited_once_with(Repository, repo_id)
+        assert repo is db.get_one.return_value
+        db.execute.assert_not_awaited()
+
+
+class TestAnswerRetry:
+    """Test the retry after an unparseable answer."""
+
+    @pytest.mark.asyncio
+    async def test_unparseable_answer_retried_in_json_mode(self):
+        """Retries once with a shorter JSON-mode generation."""
+        llm_service = AsyncMock()
+        llm_service.generate_with_usage = AsyncMock(
+            side_effect=[("not json", {}), ('{"sections": [], "unknowns": []}', {})]
+        )
+        service = QAService(AsyncMock(), AsyncMock(), llm_service, None)
+
+        await service._generate_validated_answer("Where is login?", [])
+
+        retry = llm_service.generate_with_usage.await_args_list[1]
+        assert retry.kwargs["json_mode"] is True
+        assert retry.kwargs["max_tokens"] == QAService.ANSWER_RETRY_MAX_TOKENS
+
+    @pytest.mark.asyncio
+    async def test_slow_retry_falls_back_to_evidence_only(self):
+        """Gives up on a retry that exceeds its timeout."""
+        async def generate(prompt, **kwargs):
+            if kwargs.get("json_mode"):
+                await asyncio.sleep(1)
+            return "not json", {"input_tokens": 7}
+
+        llm_service = AsyncMock()
+        llm_service.generate_with_usage = AsyncMock(side_effect=generate)
+        service = QAService(AsyncMock(), AsyncMock(), llm_service, None)
+        service.ANSWER_RETRY_TIMEOUT_SECONDS = 0.01
+
+        validated, usage = await service._generate_validated_answer("Where is login?", [])
+
+        assert validated.confidence_factors["parse_failed"] is True
+        assert usage == {"input_tokens": 7}
+
+    @pytest.mark.asyncio
+    async def test_slow_first_answer_falls_back_without_retry(self):
+        """Bounds the first generation too, and skips the retry after it times out."""
+        async def generate(prompt, **kwargs):
+            await asyncio.sleep(1)
+            return "not json", {}
+
+        llm_service = AsyncMock()
+        llm_service.generate_with_usage = AsyncMock(side_effect=generate)
+        service = QAService(AsyncMock(), AsyncMock(), llm_service, None)
+        service.ANSWER_TIMEOUT_SECONDS = 0.01
+
+        validated, usage = await service._generate_validated_answer("Where is login?", [])
+
+        assert validated.confidence_factors["parse_failed"] is True
+        assert validated.confidence_factors["generation_timed_out"] is True
+        assert usage == {}
+        assert llm_service.generate_with_usage.await_count == 1
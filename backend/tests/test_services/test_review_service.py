@@ -1,5 +1,8 @@
 """Tests for PR review service."""
 
+import uuid
+from types import SimpleNamespace
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -255,3 +258,117 @@ class TestReviewServiceIntegration:
 
         # Should only call LLM 5 times
         assert service.llm_service.generate.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_review_pr_stores_findings_in_one_insert(self, service):
+        """Inserts every finding, with its explanation, in a single statement."""
+        repo = MagicMock(owner="acme", name="api")
+        service.db.get_one = AsyncMock(return_value=repo)
+        service.db.execute = AsyncMock()
+        service.db.flush = AsyncMock()
+        service.db.commit = AsyncMock()
+        service.github_service.get_pr.return_value = {
+            "title": "Add config",
+            "html_url": "https://github.com/acme/api/pull/7",
+            "head": {"sha": "a" * 40},
+            "base": {"sha": "b" * 40},
+        }
+        service.github_service.get_pr_files.return_value = [
+            {"filename": "a.py", "status": "added", "patch": "@@ -0,0 +1 @@\n+x"},
+            {"filename": "b.py", "status": "modified", "patch": "@@ -0,0 +1 @@\n+x"},
+        ]
+        service.github_service.get_file_content.return_value = "token = 'ghp_...'"
+        service.analyzer = MagicMock()
+        service.analyzer.analyze_file.side_effect = lambda file_path, content, diff_lines: [
+            SimpleNamespace(
+                severity=service.Severity.CRITICAL,
+                category=MagicMock(value="secret_exposure"),
+                file_path=file_path,
+                start_line=1,
+                end_line=1,
+                evidence={"pattern": "GitHub token", "reason": "Token in code"},
+            )
+        ]
+        service.github_service.create_pr_review.return_value = {"id": 1}
+        service.llm_service.generate = AsyncMock(return_value="Rotate the token.")
+
+        review = await service.review_pr(str(uuid.uuid4()), 7, 42)
+
+        assert review.status == "completed"
+        service.db.add.assert_called_once_with(review)
+        rows = service.db.execute.call_args.args[1]
+        assert [row["file_path"] for row in rows] == ["a.py", "b.py"]
+        assert all(row["evidence"]["explanation"] == "Rotate the token." for row in rows)
+
+    @pytest.mark.asyncio
+    async def test_review_pr_keeps_file_order_when_one_fetch_fails(self, service):
+        """Files are analyzed concurrently; a failed fetch skips only that file."""
+        repo = MagicMock(owner="acme", name="api")
+        service.db.get_one = AsyncMock(return_value=repo)
+        service.db.execute = AsyncMock()
+        service.db.flush = AsyncMock()
+        service.db.commit = AsyncMock()
+        service.github_service.get_pr.return_value = {
+            "title": "Add config",
+            "html_url": "https://github.com/acme/api/pull/7",
+            "head": {"sha": "a" * 40},
+            "base": {"sha": "b" * 40},
+        }
+        service.github_service.get_pr_files.return_value = [
+            {"filename": name, "status": "modified", "patch": "@@ -0,0 +1 @@\n+x"}
+            for name in ("a.py", "b.py", "c.py")
+        ]
+
+        async def get_file_content(path, **kwargs):
+            if path == "b.py":
+                raise RuntimeError("not found")
+            return "x = 1"
+
+        service.github_service.get_file_content.side_effect = get_file_content
+        service.analyzer = MagicMock()
+        service.analyzer.analyze_file.side_effect = lambda file_path, content, diff_lines: [
+            SimpleNamespace(
+                severity=service.Severity.WARNING,
+                category=MagicMock(value="migration"),
+                file_path=file_path,
+                start_line=1,
+                end_line=1,
+                evidence={"reason": "Check this"},
+            )
+        ]
+        service.github_service.create_pr_review.return_value = {"id": 1}
+
+        review = await service.review_pr(str(uuid.uuid4()), 7, 42)
+
+        assert review.status == "completed"
+        rows = service.db.execute.call_args.args[1]
+        assert [row["file_path"] for row in rows] == ["a.py", "c.py"]
+
+    @pytest.mark.asyncio
+    async def test_review_pr_without_findings_does_not_flush(self, service):
+        """A clean PR writes the review once, at commit."""
+        service.db.get_one = AsyncMock(return_value=MagicMock(owner="acme", name="api"))
+        service.db.execute = AsyncMock()
+        service.db.flush = AsyncMock()
+        service.db.commit = AsyncMock()
+        service.github_service.get_pr.return_value = {
+            "title": "Docs",
+            "html_url": "https://github.com/acme/api/pull/8",
+            "head": {"sha": "a" * 40},
+            "base": {"sha": "b" * 40},
+        }
+        service.github_service.get_pr_files.return_value = [
+            {"filename": "README.md", "status": "modified", "patch": "@@ -0,0 +1 @@\n+x"},
+        ]
+        service.github_service.get_file_content.return_value = "# API"
+        service.analyzer = MagicMock()
+        service.analyzer.analyze_file.return_value = []
+        service.github_service.create_pr_review.return_value = {"id": 1}
+
+        review = await service.review_pr(str(uuid.uuid4()), 8, 42)
+
+        assert review.status == "completed"
+        assert review.id is not None
+        service.db.flush.assert_not_called()
+        service.db.execute.assert_not_called()
+        service.db.commit.assert_awaited_once()
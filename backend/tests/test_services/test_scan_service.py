@@ -0,0 +1,171 @@
+"""Tests for scan service."""
+
+import asyncio
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.analyzers.base import FindingMatch
+from app.models.scan import EvidenceSnippet, Finding, FindingInstance
+from app.services.scan_service import ScanService
+
+
+class StubAnalyzer:
+    """Analyzer returning fixed matches."""
+
+    def __init__(self, name: str, matches: list):
+        self.name = name
+        self.matches = matches
+        self.ran = False
+
+    def analyze(self, context):
+        self.ran = True
+        return self.matches
+
+
+class TestScanServiceAnalyzers:
+    """Test running analyzers over a scan context."""
+
+    @pytest.fixture
+    def service(self):
+        svc = ScanService(MagicMock())
+        svc.coverage_service = MagicMock()
+        return svc
+
+    def test_matches_keep_analyzer_order(self, service):
+        """Matches are returned in analyzer order."""
+        service.analyzers = [
+            StubAnalyzer("security", ["s1", "s2"]),
+            StubAnalyzer("privacy", ["p1"]),
+            StubAnalyzer("performance", []),
+            StubAnalyzer("reliability", ["r1"]),
+        ]
+
+        matches = service._run_analyzers(SimpleNamespace(), set())
+
+        assert matches == ["s1", "s2", "p1", "r1"]
+
+    def test_only_enabled_analyzers_run_and_are_recorded(self, service):
+        """Skips disabled analyzers and records each one that runs."""
+        security = StubAnalyzer("security", ["s1"])
+        privacy = StubAnalyzer("privacy", ["p1"])
+        service.analyzers = [security, privacy]
+
+        matches = service._run_analyzers(SimpleNamespace(), {"privacy"})
+
+        assert matches == ["p1"]
+        assert not security.ran
+        assert [c.args for c in service.coverage_service.record_analyzer_run.call_args_list] == [
+            ("privacy",)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_analysis_runs_in_one_worker_thread(self, service, monkeypatch):
+        """Opens, uses and closes the AST cache on the same non-loop thread."""
+        threads = {}
+        cache = MagicMock()
+        cache.close.side_effect = lambda: threads.setdefault("close", threading.get_ident())
+
+        def open_cache(cache_dir):
+            threads["open"] = threading.get_ident()
+            return cache
+
+        def parse_repository(clone_path, coverage_service=None):
+            threads["parse"] = threading.get_ident()
+            return SimpleNamespace()
+
+        monkeypatch.setattr("app.services.scan_service.AstCache.open", open_cache)
+        service.parser_service = MagicMock()
+        service.parser_service.parse_repository.side_effect = parse_repository
+        service._load_file_contents = MagicMock(return_value={})
+        service.analyzers = [StubAnalyzer("security", ["s1"])]
+
+        result = await asyncio.to_thread(service._analyze_repository, "/tmp/clone", set())
+
+        assert result[3] == ["s1"]
+        assert len(set(threads.values())) == 1
+        assert threads["open"] != threading.get_ident()
+        cache.close.assert_called_once()
+        assert service.parser_service.ast_cache is None
+
+
+class TestScanServicePersistence:
+    """Test batched writes of snapshots and findings."""
+
+    @pytest.fixture
+    def service(self):
+        db = MagicMock()
+        db.flush = AsyncMock()
+        db.commit = AsyncMock()
+        return ScanService(db)
+
+    def _match(self, rule_id, file_path, line):
+        return FindingMatch(
+            rule_id=rule_id,
+            category="security",
+            title="Hard-coded secret",
+            description="A secret is committed to the repository.",
+            severity="high",
+            confidence="high",
+            remediation="Load it from the environment.",
+            file_path=file_path,
+            start_line=line,
+            end_line=line,
+        )
+
+    @pytest.mark.asyncio
+    async def test_snapshots_are_added_in_one_batch(self, service):
+        """Adds every snapshot with its id set, then commits once without flushing."""
+        scan_run = SimpleNamespace(id=uuid.uuid4())
+
+        snapshots = await service._store_file_snapshots(
+            scan_run, {"a.py": "x = 1\n", "b.py": "y = 2\n"}
+        )
+
+        service.db.add_all.assert_called_once()
+        added = list(service.db.add_all.call_args.args[0])
+        assert [s.path for s in added] == ["a.py", "b.py"]
+        assert all(s.id is not None for s in added)
+        assert snapshots == {s.path: s for s in added}
+        service.db.flush.assert_not_awaited()
+        service.db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_findings_evidence_and_instances_are_added_in_batches(self, service):
+        """Links rows by preassigned ids and writes each table in one batch."""
+        scan_run = SimpleNamespace(id=uuid.uuid4())
+        snapshot = SimpleNamespace(id=uuid.uuid4())
+        content = "token = 'a'\ntoken = 'b'\n"
+        matches = [
+            self._match("security.secrets", "app/config.py", 1),
+            self._match("security.secrets", "app/config.py", 2),
+            self._match("security.eval", "app/config.py", 2),
+        ]
+        coverage_report = SimpleNamespace(coverage_percentage=100)
+
+        await service._store_findings(
+            scan_run,
+            matches,
+            {"app/config.py": snapshot},
+            {"app/config.py": content},
+            coverage_report,
+        )
+
+        batches = [list(c.args[0]) for c in service.db.add_all.call_args_list]
+        assert [type(batch[0]) for batch in batches] == [Finding, EvidenceSnippet, FindingInstance]
+        findings, evidence, instances = batches
+        assert [f.rule_id for f in findings] == ["security.secrets", "security.eval"]
+        assert len(evidence) == len(instances) == 3
+        assert all(e.file_snapshot_id == snapshot.id for e in evidence)
+        assert [i.evidence_snippet_id for i in instances] == [e.id for e in evidence]
+        assert [i.finding_id for i in instances] == [
+            findings[0].id,
+            findings[0].id,
+            findings[1].id,
+        ]
+        service.db.add.assert_not_called()
+        service.db.flush.assert_not_awaited()
+        service.db.commit.assert_awaited_once()